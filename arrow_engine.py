@@ -0,0 +1,184 @@
+import pandas as pd
+
+from preprocess import CATEGORICAL_COLUMNS, read_exports, resolve_csv_paths
+
+# --- CONFIGURATION ---
+# Formats tried, in order, when parsing the 'Created' column with Arrow. A format is only used if it
+# parses every non-empty value; otherwise the column falls back to pandas' format inference.
+CREATED_FORMATS = ['%m/%d/%Y %H:%M', '%m/%d/%Y %H:%M:%S', '%Y-%m-%d %H:%M:%S', '%Y-%m-%dT%H:%M:%S', '%m/%d/%Y']
+
+
+def _require_pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.compute
+        import pyarrow.csv
+    except ImportError as e:
+        raise ImportError("The Arrow engine needs pyarrow. Install it with 'pip install pyarrow'.") from e
+    return pyarrow, pyarrow.compute, pyarrow.csv
+
+
+def is_arrow_frame(df):
+    """True for frames produced by load_and_preprocess_arrow (their component lists are Arrow-backed)."""
+    return 'All_Components_List' in df.columns and isinstance(df['All_Components_List'].dtype, pd.ArrowDtype)
+
+
+def _parse_created(pa, pc, column):
+    """Parses the 'Created' strings with the first format in CREATED_FORMATS that fits every value."""
+    if pa.types.is_timestamp(column.type):
+        return column
+    non_empty = pc.sum(pc.is_valid(column)).as_py() or 0
+    for fmt in CREATED_FORMATS:
+        parsed = pc.strptime(column, format=fmt, unit='s', error_is_null=True)
+        if (pc.sum(pc.is_valid(parsed)).as_py() or 0) == non_empty:
+            return parsed
+    # Unknown or mixed formats: let pandas infer them, as the pandas engine does.
+    parsed = pd.to_datetime(column.to_pandas(), errors='coerce')
+    return pa.chunked_array([pa.array(parsed, type=pa.timestamp('us'))])
+
+
+def _explode(pa, pc, table, list_column):
+    """Returns (table with one row per list element, the flattened elements)."""
+    list_column = list_column.combine_chunks()
+    values = pc.list_flatten(list_column)
+    table = table.take(pc.list_parent_indices(list_column))
+    return table, values
+
+
+def load_and_preprocess_arrow(csv_path, component_cols, project_col):
+    """
+    Arrow version of preprocess.load_and_preprocess. Parses the CSV on multiple threads, does the
+    project explode and component cleaning with Arrow compute kernels, and returns a pandas frame
+    with the same columns. 'All_Components_List' is an Arrow list<string> column, categorical
+    columns arrive as pandas categoricals and text columns keep Arrow-backed strings.
+    Several exports (a directory, glob or list) are merged by preprocess.read_exports first.
+    """
+    pa, pc, pa_csv = _require_pyarrow()
+
+    # Project and component codes look numeric ("590"), so always read them as text.
+    column_types = {project_col: pa.string(), 'Created': pa.string()}
+    if component_cols and component_cols[0]:
+        column_types[component_cols[0]] = pa.string()
+    paths = resolve_csv_paths(csv_path)
+    if len(paths) == 1:
+        table = pa_csv.read_csv(
+            paths[0],
+            read_options=pa_csv.ReadOptions(use_threads=True),
+            convert_options=pa_csv.ConvertOptions(column_types=column_types, strings_can_be_null=True),
+        )
+    else:
+        table = pa.Table.from_pandas(read_exports(paths, list(column_types)), preserve_index=False)
+        for col, col_type in column_types.items():
+            if col in table.column_names:
+                table = table.set_column(table.column_names.index(col), col, table[col].cast(col_type))
+
+    # --- Step 1: Ensure required columns exist ---
+    if project_col not in table.column_names:
+        raise ValueError(f"Project column '{project_col}' not found in CSV.")
+    if 'Created' not in table.column_names:
+        raise ValueError("'Created' column not found, which is required for time-series graphs.")
+
+    # --- Step 2: Parse dates and drop rows where that failed ---
+    created = _parse_created(pa, pc, table['Created'])
+    table = table.set_column(table.column_names.index('Created'), 'Created', created)
+    table = table.filter(pc.is_valid(table['Created']))
+
+    # --- Step 3: One row per project for multi-project reports ---
+    projects = pc.split_pattern(table[project_col], ',')
+    table, project_values = _explode(pa, pc, table, projects)
+    table = table.set_column(table.column_names.index(project_col), project_col,
+                             pc.utf8_trim_whitespace(project_values))
+
+    # --- Step 4: Clean the component column ---
+    comp_col_name = component_cols[0] if component_cols and component_cols[0] in table.column_names \
+        else 'All_Components'
+    if comp_col_name not in table.column_names:
+        table = table.append_column(comp_col_name, pa.array(['General'] * table.num_rows, type=pa.string()))
+    components = pc.fill_null(table[comp_col_name], 'General')
+    components = pc.if_else(pc.equal(pc.utf8_trim_whitespace(components), ''), 'General', components)
+    table = table.set_column(table.column_names.index(comp_col_name), comp_col_name, components)
+
+    # Split into a list per row and strip the row's own project prefix ("590_SC" -> "SC").
+    component_lists = pc.split_pattern(components, ',').combine_chunks()
+    values = pc.utf8_trim_whitespace(pc.list_flatten(component_lists))
+    value_projects = table[project_col].combine_chunks().take(pc.list_parent_indices(component_lists))
+    # There are few projects, so one vectorized replace per project beats a Python call per row.
+    for project in pc.unique(value_projects).to_pylist():
+        if project is None:
+            continue
+        values = pc.if_else(pc.equal(value_projects, project),
+                            pc.replace_substring(values, f'{project}_', ''), values)
+    values = pc.if_else(pc.equal(values, ''), 'General', values)
+    offsets = pa.concat_arrays([pa.array([0], type=pa.int32()),
+                                pc.cumulative_sum(pc.list_value_length(component_lists)).cast(pa.int32())])
+    component_lists = pa.ListArray.from_arrays(offsets, values)
+    table = table.append_column('All_Components_List', component_lists)
+    joined = pc.binary_join(component_lists, ', ')
+    if 'All_Components' in table.column_names:
+        # Without a component column, Step 4 already added 'All_Components' as the one to clean.
+        table = table.set_column(table.column_names.index('All_Components'), 'All_Components', joined)
+    else:
+        table = table.append_column('All_Components', joined)
+
+    # --- Step 5: Dictionary-encode repeated text columns; pandas receives them as categoricals ---
+    for col in [project_col, comp_col_name, 'All_Components'] + CATEGORICAL_COLUMNS:
+        if col in table.column_names and pa.types.is_string(table.schema.field(col).type):
+            table = table.set_column(table.column_names.index(col), col, pc.dictionary_encode(table[col]))
+
+    list_type = pa.list_(pa.string())
+    return table.to_pandas(types_mapper={list_type: pd.ArrowDtype(list_type)}.get)
+
+
+# --- Chart aggregations ---
+# Each function takes a project frame from load_and_preprocess_arrow and returns the same pandas
+# frame the matching chart in graphs.py computes with pandas.
+
+def _to_table(pa, df, columns):
+    return pa.Table.from_pandas(df[columns], preserve_index=False)
+
+
+def component_counts(project_df):
+    """Reports per component, most frequent first: columns ['Component', 'Count']."""
+    pa, pc, _ = _require_pyarrow()
+    table = _to_table(pa, project_df, ['All_Components_List'])
+    components = pc.list_flatten(table['All_Components_List'])
+    counts = pa.table({'Component': components}).group_by('Component').aggregate([([], 'count_all')])
+    counts = counts.rename_columns(['Component', 'Count']).sort_by([('Count', 'descending')])
+    return counts.to_pandas()
+
+
+def value_counts(project_df, col):
+    """Counts of each non-null value of col, most frequent first, as a Series like pandas' value_counts."""
+    pa, pc, _ = _require_pyarrow()
+    table = _to_table(pa, project_df, [col])
+    table = table.filter(pc.is_valid(table[col]))
+    counts = table.group_by(col).aggregate([([], 'count_all')]).sort_by([('count_all', 'descending')])
+    return pd.Series(counts['count_all'].to_numpy(), index=counts[col].to_pylist(), name='count')
+
+
+def component_group_counts(project_df, group_col):
+    """Reports per (component, group_col) pair: columns ['Component', group_col, 'Count']."""
+    pa, pc, _ = _require_pyarrow()
+    table = _to_table(pa, project_df, ['All_Components_List', group_col])
+    table, components = _explode(pa, pc, table, table['All_Components_List'])
+    table = pa.table({'Component': components, group_col: table[group_col]})
+    table = table.filter(pc.and_(pc.is_valid(table['Component']), pc.is_valid(table[group_col])))
+    counts = table.group_by(['Component', group_col]).aggregate([([], 'count_all')])
+    counts = counts.rename_columns(['Component', group_col, 'Count']).sort_by([('Component', 'ascending')])
+    return counts.to_pandas()
+
+
+def monthly_counts(project_df):
+    """New reports per calendar month, including empty months: columns ['Created', 'Count']."""
+    pa, pc, _ = _require_pyarrow()
+    table = _to_table(pa, project_df, ['Created'])
+    months = pc.floor_temporal(table['Created'], unit='month')
+    counts = pa.table({'Created': months}).group_by('Created').aggregate([([], 'count_all')]).to_pandas()
+    if counts.empty:
+        return pd.DataFrame({'Created': pd.Series(dtype='datetime64[ns]'), 'Count': pd.Series(dtype='int64')})
+
+    # Label each month by its last day, like pd.Grouper(freq=MonthEnd()), and fill in the gaps.
+    counts = counts.set_index(counts['Created'] + pd.offsets.MonthEnd(0))['count_all']
+    all_months = pd.date_range(counts.index.min(), counts.index.max(), freq=pd.offsets.MonthEnd())
+    counts = counts.reindex(all_months, fill_value=0)
+    return pd.DataFrame({'Created': counts.index, 'Count': counts.to_numpy()})
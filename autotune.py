@@ -0,0 +1,198 @@
+import math
+import statistics
+import threading
+import time
+
+from llm_backends import DEFAULT_MAX_CONNECTIONS
+
+# --- CONFIGURATION ---
+CONTEXT_TOKENS = 4096  # Ollama's default num_ctx. Raise this if the server runs the model with a larger context.
+CONTEXT_SAFETY_MARGIN = 0.8  # Only plan to fill this fraction of the context; token counts per report vary.
+RESPONSE_TOKEN_RESERVE = 768  # Room kept free for the answer (raised to the longest answer seen).
+INITIAL_CHUNK_SIZE = 5
+MIN_CHUNK_SIZE = 2
+MAX_CHUNK_SIZE = 50  # Beyond this the summaries lose detail, whatever the context allows.
+QUEUE_DELAY_TOLERANCE = 0.25  # Back off when requests wait this fraction of their service time in the server queue.
+MIN_THROUGHPUT_GAIN = 0.05  # A larger chunk or more requests in flight must gain at least this much to be used.
+MODEL_LOAD_IGNORE_S = 1.0  # Calls that spent longer than this loading the model are not used for timing.
+CHARS_PER_TOKEN = 4.0  # Used until the server reports prompt token counts.
+SMOOTHING = 0.3  # Weight of the newest call in the running averages.
+MIN_CHUNK_SIZE_CHANGE = 0.1  # Ignore chunk size changes smaller than this fraction (except to fit the context).
+
+
+def _smooth(average, value):
+    return value if average is None else (1 - SMOOTHING) * average + SMOOTHING * value
+
+
+class Autotuner:
+    """
+    Picks the chunk size and the number of requests in flight from the latency, token counts
+    and durations the server reports for the first calls of a run, and keeps adjusting both.
+
+    - Chunk size: the largest chunk whose prompt and answer fit in the context window bounds it.
+      Within that, the smallest chunk reaching (1 - MIN_THROUGHPUT_GAIN) of the best possible
+      reports per minute is used. The estimate comes from a fixed cost per call (instructions,
+      answer) plus a cost per report.
+    - Requests in flight: starts at one and adds one at a time while reports per minute keeps
+      improving. It steps back as soon as requests sent at the limit spend a noticeable time
+      queued on the server, meaning the server is already running all the requests it can at once.
+
+    chunk_size and concurrency can be read at any time; record_call is thread-safe.
+    """
+
+    def __init__(self, initial_chunk_size=INITIAL_CHUNK_SIZE, max_concurrency=DEFAULT_MAX_CONNECTIONS,
+                 context_tokens=CONTEXT_TOKENS):
+        self.chunk_size = initial_chunk_size
+        self.concurrency = 1
+        self.max_concurrency = max_concurrency
+        self.context_tokens = context_tokens
+        self._lock = threading.Lock()
+        self._in_flight = 0
+
+        # Running estimates from the calls seen so far.
+        self._tokens_per_char = 1 / CHARS_PER_TOKEN
+        self._report_tokens = None  # Averages of report tokens and report count per call; their ratio
+        self._reports = None  # weights big chunks more than small ones, whose CSV header skews them.
+        self._max_other_tokens = 0  # Instructions plus the previous summary: the prompt apart from the reports.
+        self._max_response_tokens = 0
+        self._fixed_s = None
+        self._per_report_s = None
+
+        # Calls completed since the last change of the in-flight limit.
+        self._window = []
+        self._window_start = time.perf_counter()
+        self._best = None  # (concurrency, reports per second)
+        self._settled = max_concurrency <= 1
+
+    def call_started(self):
+        """Counts a request going out; returns how many are in flight, including this one."""
+        with self._lock:
+            self._in_flight += 1
+            return self._in_flight
+
+    def record_call(self, response, wall_time_s, reports, report_chars, prompt_chars, in_flight_at_start=1):
+        """
+        Learns from one finished summary call that covered `reports` reports (report_chars of the
+        prompt's prompt_chars characters). Every call_started() must be matched by a record_call(),
+        with response=None if the request failed.
+        """
+        with self._lock:
+            self._in_flight -= 1
+        if response is None:
+            return
+        response = response if hasattr(response, 'get') else {}
+        prompt_tokens = response.get('prompt_eval_count') or 0
+        eval_tokens = response.get('eval_count') or 0
+        load_s = (response.get('load_duration') or 0) / 1e9
+        prompt_s = (response.get('prompt_eval_duration') or 0) / 1e9
+        eval_s = (response.get('eval_duration') or 0) / 1e9
+        server_s = load_s + prompt_s + eval_s
+        started_at = time.perf_counter() - wall_time_s
+
+        with self._lock:
+            # --- Token accounting, for the context limit ---
+            if prompt_tokens and prompt_chars:
+                # Servers that reuse a cached prompt prefix may count fewer tokens; keep the ratio plausible.
+                self._tokens_per_char = _smooth(self._tokens_per_char, min(max(prompt_tokens / prompt_chars, 0.15), 0.6))
+            report_tokens = self._tokens_per_char * report_chars
+            if reports:
+                self._report_tokens = _smooth(self._report_tokens, report_tokens)
+                self._reports = _smooth(self._reports, reports)
+            self._max_other_tokens = max(self._max_other_tokens, self._tokens_per_char * (prompt_chars - report_chars))
+            self._max_response_tokens = max(self._max_response_tokens, eval_tokens)
+
+            # --- Timing, for throughput ---
+            queue_fraction = None
+            if load_s <= MODEL_LOAD_IGNORE_S and wall_time_s > 0:
+                if server_s > 0:
+                    # Time the server reports working on the request vs. the time we waited for it.
+                    queue_fraction = max(wall_time_s - server_s, 0.0) / server_s
+                    per_report_s = prompt_s * (report_tokens / prompt_tokens) / reports if prompt_tokens and reports else 0.0
+                    self._per_report_s = _smooth(self._per_report_s, per_report_s)
+                    self._fixed_s = _smooth(self._fixed_s, max(server_s - per_report_s * reports, 0.0))
+                # Only calls sent with exactly the current limit in flight say anything about it. After
+                # the limit is lowered, tasks already running keep more requests going for a while.
+                if started_at >= self._window_start and in_flight_at_start == self.concurrency:
+                    self._window.append((reports, wall_time_s, queue_fraction))
+
+            old_chunk_size, old_concurrency = self.chunk_size, self.concurrency
+            self._update_chunk_size()
+            self._update_concurrency()
+            new_chunk_size, new_concurrency = self.chunk_size, self.concurrency
+
+        if new_chunk_size != old_chunk_size:
+            print(f"  -> Autotune: chunk size {old_chunk_size} -> {new_chunk_size} reports "
+                  f"(context allows {self.max_chunk_size()})")
+        if new_concurrency != old_concurrency:
+            print(f"  -> Autotune: {new_concurrency} request(s) in flight (was {old_concurrency})")
+
+    def _tokens_per_report(self):
+        return self._report_tokens / self._reports if self._reports else None
+
+    def max_chunk_size(self):
+        """The largest chunk whose prompt and answer fit in the context window."""
+        tokens_per_report = self._tokens_per_report()
+        if not tokens_per_report:
+            return MAX_CHUNK_SIZE
+        budget = (self.context_tokens * CONTEXT_SAFETY_MARGIN - self._max_other_tokens
+                  - max(RESPONSE_TOKEN_RESERVE, self._max_response_tokens))
+        return int(min(max(budget / tokens_per_report, MIN_CHUNK_SIZE), MAX_CHUNK_SIZE))
+
+    def _update_chunk_size(self):
+        cap = self.max_chunk_size()
+        if self._fixed_s is None:
+            # No timings yet: only make sure the chunk fits.
+            self.chunk_size = min(self.chunk_size, cap)
+            return
+        # Reports per minute at chunk size c is c / (fixed + per_report * c). Solve for the smallest c
+        # within MIN_THROUGHPUT_GAIN of the rate at the cap.
+        keep = 1 - MIN_THROUGHPUT_GAIN
+        fixed, per_report = self._fixed_s, self._per_report_s or 0.0
+        denominator = fixed + per_report * cap * (1 - keep)
+        target = cap if denominator <= 0 else math.ceil(keep * cap * fixed / denominator)
+        target = int(min(max(target, MIN_CHUNK_SIZE), cap))
+        if self.chunk_size > cap or abs(target - self.chunk_size) >= self.chunk_size * MIN_CHUNK_SIZE_CHANGE:
+            self.chunk_size = target
+
+    def _update_concurrency(self):
+        # Judge each setting on a few calls that all ran with it.
+        if len(self._window) < max(3, self.concurrency):
+            return
+        # Reports per second of request time, times the requests running side by side. Small chunks
+        # (a component's last one, small components) are slow per report whatever the setting, so
+        # compare settings on full-size chunks where there are any.
+        calls = [call for call in self._window if call[0] >= self.chunk_size / 2] or self._window
+        taken_s = sum(wall_time_s for _, wall_time_s, _ in calls)
+        throughput = self.concurrency * sum(reports for reports, _, _ in calls) / max(taken_s, 1e-9)
+        queue_fractions = [fraction for _, _, fraction in self._window if fraction is not None]
+        queueing = bool(queue_fractions) and statistics.fmean(queue_fractions) > QUEUE_DELAY_TOLERANCE
+        self._window = []
+        self._window_start = time.perf_counter()
+
+        if queueing and self.concurrency > 1:
+            # The server is already busy with as many requests as it runs at once.
+            self.concurrency -= 1
+            self._settled = True
+        elif not self._settled:
+            if self._best is None or throughput > self._best[1] * (1 + MIN_THROUGHPUT_GAIN):
+                self._best = (self.concurrency, throughput)
+                if self.concurrency < self.max_concurrency:
+                    self.concurrency += 1
+                else:
+                    self._settled = True
+            else:
+                # One more request in flight didn't help; go back to the best setting seen.
+                self.concurrency = self._best[0]
+                self._settled = True
+
+    def summary(self):
+        """The current settings and estimates, for the log and the run report."""
+        with self._lock:
+            return {
+                'chunk_size': self.chunk_size,
+                'concurrency': self.concurrency,
+                'max_chunk_size': self.max_chunk_size(),
+                'tokens_per_report': self._tokens_per_report(),
+                'fixed_s_per_call': self._fixed_s,
+                'seconds_per_report': self._per_report_s,
+            }
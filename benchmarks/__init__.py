@@ -0,0 +1 @@
+"""Reproducible performance benchmarks for the bug report summarizer pipeline."""
@@ -0,0 +1,218 @@
+import json
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# A canned response in the exact markdown format the prompts in ollama_functions.py ask for,
+# so parse_llm_output sees realistic input.
+CANNED_SUMMARY_MD = """## Summary
+- Recurring LED state errors after resuming from auto pause
+- OTA update anti-rollback checks are not enforced
+- Intermittent app disconnects during cleaning
+
+## Recommendations for Developers
+- Add state machine coverage for pause/resume transitions
+- Enforce version checks in the OTA bootloader
+
+## Recommendations for Testers
+- Add regression tests for filter removal during pause
+- Test OTA downgrades on every release candidate
+
+## Potential Customer Impact
+Customers may see misleading status lights and could end up on vulnerable firmware.
+
+## Impact Level
+Impact: MEDIUM
+"""
+
+
+# The same content as CANNED_SUMMARY_MD, for requests that pass a JSON schema as `format`.
+CANNED_SUMMARY_FIELDS = {
+    'summary': ['Recurring LED state errors after resuming from auto pause',
+                'OTA update anti-rollback checks are not enforced',
+                'Intermittent app disconnects during cleaning'],
+    'rec_devs': ['Add state machine coverage for pause/resume transitions',
+                 'Enforce version checks in the OTA bootloader'],
+    'rec_testers': ['Add regression tests for filter removal during pause',
+                    'Test OTA downgrades on every release candidate'],
+    'customer_impact': 'Customers may see misleading status lights and could end up on vulnerable firmware.',
+    'impact_level': 'MEDIUM',
+}
+
+
+# Component block headers in batched prompts (see BATCH_BLOCK_START in ollama_functions.py).
+BATCH_BLOCK_PATTERN = re.compile(r'^=== COMPONENT: (.+?) ===$', re.MULTILINE)
+
+
+class MockOllamaServer:
+    """
+    A local HTTP server that speaks enough of the Ollama REST API (/api/chat, /api/generate,
+    /api/tags, /api/version) to drive the pipeline without a GPU.
+
+    Each chat call sleeps for `latency_s`, plus the time to evaluate the prompt at
+    `prompt_tokens_per_sec` and to generate the response at `tokens_per_sec`. Like Ollama,
+    the first request (or the first after keep_alive expires) also pays `load_s` to load the
+    model, and prompt tokens shared with the previous prompt's prefix are served from cache.
+    At most `parallel` requests are processed at once (like OLLAMA_NUM_PARALLEL); the rest wait
+    in a queue, and that wait is not included in the reported durations.
+    """
+
+    def __init__(self, host='127.0.0.1', port=0, latency_s=0.05, tokens_per_sec=200.0, models=None, load_s=0.0,
+                 prompt_tokens_per_sec=0.0, default_keep_alive_s=300.0, parallel=1):
+        self.latency_s = latency_s
+        self.tokens_per_sec = tokens_per_sec
+        self.prompt_tokens_per_sec = prompt_tokens_per_sec
+        self.load_s = load_s
+        self.default_keep_alive_s = default_keep_alive_s
+        self.models = models or ['llama3.1:8b']
+        self.request_count = 0
+        self._lock = threading.Lock()
+        self._slots = threading.Semaphore(parallel)
+        self._loaded_until = 0.0
+        self._last_prompt = ''
+        self._server = ThreadingHTTPServer((host, port), self._make_handler())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self._server.server_address[:2]
+        return f'http://{host}:{port}'
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+
+    @staticmethod
+    def _count_tokens(text):
+        # Roughly four characters per token, which is close enough for benchmarking.
+        return max(1, len(text) // 4)
+
+    @staticmethod
+    def _response_text(request, prompt_text):
+        schema = request.get('format')
+        if isinstance(schema, dict):
+            def fill(properties):
+                # Batched requests nest one summary object per component.
+                return {name: fill(prop.get('properties', {})) if prop.get('type') == 'object'
+                        else CANNED_SUMMARY_FIELDS.get(name, '') for name, prop in properties.items()}
+            return json.dumps(fill(schema.get('properties', {})))
+        components = BATCH_BLOCK_PATTERN.findall(prompt_text)
+        if components:
+            return '\n'.join(f'=== COMPONENT: {comp} ===\n{CANNED_SUMMARY_MD}=== END COMPONENT ===\n'
+                             for comp in components)
+        return CANNED_SUMMARY_MD
+
+    def _keep_alive_seconds(self, request):
+        keep_alive = request.get('keep_alive')
+        if keep_alive is None:
+            return self.default_keep_alive_s
+        if isinstance(keep_alive, (int, float)):
+            return float('inf') if keep_alive < 0 else float(keep_alive)
+        units = {'s': 1, 'm': 60, 'h': 3600}
+        text = str(keep_alive).strip()
+        if text.startswith('-'):
+            return float('inf')
+        if text and text[-1] in units:
+            return float(text[:-1]) * units[text[-1]]
+        return float(text)
+
+    def _completion(self, request, prompt_text, generate=True):
+        """Simulates generation and returns the text plus the timing fields Ollama puts on every response."""
+        now = time.monotonic()
+        with self._lock:
+            self.request_count += 1
+            load_seconds = self.load_s if now >= self._loaded_until else 0.0
+            self._loaded_until = now + load_seconds + self._keep_alive_seconds(request)
+            # Only the part of the prompt after the prefix shared with the previous prompt is evaluated.
+            shared = 0
+            for a, b in zip(prompt_text, self._last_prompt):
+                if a != b:
+                    break
+                shared += 1
+            if generate:
+                self._last_prompt = prompt_text
+
+        content = self._response_text(request, prompt_text) if generate else ''
+        prompt_tokens = self._count_tokens(prompt_text)
+        uncached_tokens = self._count_tokens(prompt_text[shared:]) if prompt_text[shared:] else 0
+        prompt_seconds = uncached_tokens / self.prompt_tokens_per_sec if self.prompt_tokens_per_sec else 0.0
+        eval_tokens = self._count_tokens(content) if content else 0
+        eval_seconds = eval_tokens / self.tokens_per_sec if self.tokens_per_sec else 0.0
+
+        with self._slots:
+            start = time.perf_counter()
+            time.sleep(load_seconds + (self.latency_s + prompt_seconds + eval_seconds if generate else 0.0))
+            total_ns = int((time.perf_counter() - start) * 1e9)
+
+        return content, {
+            'model': request.get('model', self.models[0]),
+            'created_at': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+            'done': True,
+            'done_reason': 'stop',
+            'total_duration': total_ns,
+            'load_duration': int(load_seconds * 1e9),
+            'prompt_eval_count': prompt_tokens,
+            'prompt_eval_duration': int((self.latency_s + prompt_seconds) * 1e9),
+            'eval_count': eval_tokens,
+            'eval_duration': int(eval_seconds * 1e9),
+        }
+
+    def _make_handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, format, *args):
+                pass  # Keep benchmark output clean.
+
+            def _send_json(self, payload, status=200):
+                body = json.dumps(payload).encode('utf-8')
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def _read_json(self):
+                length = int(self.headers.get('Content-Length') or 0)
+                return json.loads(self.rfile.read(length) or b'{}')
+
+            def do_GET(self):
+                if self.path == '/api/tags':
+                    self._send_json({'models': [
+                        {'name': name, 'model': name, 'size': 4_700_000_000,
+                         'modified_at': '2024-01-01T00:00:00Z', 'digest': 'mock', 'details': {}}
+                        for name in server.models
+                    ]})
+                elif self.path == '/api/version':
+                    self._send_json({'version': '0.0.0-mock'})
+                else:
+                    self._send_json({'error': 'not found'}, status=404)
+
+            def do_POST(self):
+                request = self._read_json()
+                if self.path == '/api/chat':
+                    prompt_text = ''.join(m.get('content', '') for m in request.get('messages', []))
+                    content, fields = server._completion(request, prompt_text)
+                    self._send_json({**fields, 'message': {'role': 'assistant', 'content': content}})
+                elif self.path == '/api/generate':
+                    # An empty prompt only loads the model, as Ollama does for preloading.
+                    prompt = request.get('prompt', '')
+                    content, fields = server._completion(request, prompt, generate=bool(prompt))
+                    self._send_json({**fields, 'response': content})
+                else:
+                    self._send_json({'error': 'not found'}, status=404)
+
+        return Handler
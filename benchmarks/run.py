@@ -0,0 +1,279 @@
+"""
+Benchmark harness for the report pipeline.
+
+Generates a synthetic Jira export, starts a mock Ollama server and times every pipeline stage.
+Results are written as JSON so runs can be compared across commits:
+
+    python -m benchmarks.run --rows 5000 --output bench_before.json
+    python -m benchmarks.run --rows 5000 --output bench_after.json --compare bench_before.json
+
+Add --memory to also record the peak RSS of the data pipeline, measured in a fresh process.
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks.mock_ollama import MockOllamaServer
+from benchmarks.synthetic_data import generate_export
+
+PROJECT_COL = 'Project List'
+COMPONENT_COL = 'Component/s'
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _git_commit():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], text=True,
+                                       stderr=subprocess.DEVNULL).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _time_call(func, repeat):
+    """Runs func `repeat` times and returns (last result, timing summary)."""
+    durations = []
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        durations.append(time.perf_counter() - start)
+    return result, {
+        'runs': repeat,
+        'min_s': min(durations),
+        'median_s': statistics.median(durations),
+        'max_s': max(durations),
+    }
+
+
+def measure_time_to_first_window(repeat, ollama_host):
+    """
+    Launches main.py with --measure-startup in a fresh process and collects the reported
+    time-to-first-window. Needs a display (e.g. run under xvfb-run on a headless machine).
+    """
+    durations = []
+    env = dict(os.environ, OLLAMA_HOST=ollama_host)
+    for _ in range(repeat):
+        output = subprocess.check_output([sys.executable, 'main.py', '--measure-startup'], cwd=REPO_ROOT, env=env,
+                                         text=True, timeout=120)
+        durations.append(json.loads(output.strip().splitlines()[-1])['time_to_first_window_s'])
+    return {
+        'runs': repeat,
+        'min_s': min(durations),
+        'median_s': statistics.median(durations),
+        'max_s': max(durations),
+    }
+
+
+def _rss_probe(csv_path, engine='pandas'):
+    """
+    Runs the data side of the pipeline (load, split/export, per-project chart frames) and prints
+    this process's peak RSS as JSON. Invoked in a fresh process by measure_peak_rss.
+    """
+    import resource
+    from preprocess import load_and_preprocess, split_by_project_and_component
+
+    df = load_and_preprocess(csv_path, [COMPONENT_COL], PROJECT_COL, engine=engine)
+    output_dir = tempfile.mkdtemp(prefix='bug_report_rss_')
+    split_by_project_and_component(df, PROJECT_COL, output_dir)
+    for positions in df.groupby(PROJECT_COL, observed=True, sort=False).indices.values():
+        df.take(positions).explode('All_Components_List')
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in kilobytes on Linux and in bytes on macOS.
+    peak_mb = peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+    print(json.dumps({'peak_rss_mb': peak_mb, 'rows_after_explode': len(df)}))
+
+
+def measure_peak_rss(csv_path, engine='pandas'):
+    """Returns the peak RSS of the data pipeline on csv_path, measured in a fresh process (Unix only)."""
+    output = subprocess.check_output([sys.executable, '-m', 'benchmarks.run', '--rss-probe', csv_path,
+                                      '--engine', engine], cwd=REPO_ROOT, text=True)
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def run_benchmarks(args):
+    work_dir = tempfile.mkdtemp(prefix='bug_report_bench_')
+    csv_path = generate_export(
+        os.path.join(work_dir, 'synthetic_export.csv'), rows=args.rows, projects=args.projects,
+        components_per_project=args.components, multi_project_rate=args.multi_project_rate,
+        multi_component_rate=args.multi_component_rate, seed=args.seed
+    )
+
+    mock = MockOllamaServer(latency_s=args.latency, tokens_per_sec=args.tokens_per_sec, load_s=args.load_time,
+                            prompt_tokens_per_sec=args.prompt_tokens_per_sec, parallel=args.parallel).start()
+
+    from llm_backends import OllamaBackend
+    from preprocess import load_and_preprocess, split_by_project_and_component
+    from ollama_functions import generate_summary_table, warm_up_model
+    from webpage import build_html_report
+    from telemetry import RunTelemetry
+    from autotune import Autotuner
+    import graphs
+
+    backend = OllamaBackend(host=mock.url)
+    timings = {}
+    memory = measure_peak_rss(csv_path, args.engine) if args.memory else None
+    try:
+        if args.startup:
+            timings['time_to_first_window'] = measure_time_to_first_window(args.repeat, mock.url)
+
+        df, timings['load_and_preprocess'] = _time_call(
+            lambda: load_and_preprocess(csv_path, [COMPONENT_COL], PROJECT_COL, engine=args.engine), args.repeat)
+
+        output_dir = os.path.join(work_dir, 'project_component_csvs')
+        project_component_rows, timings['split_by_project_and_component'] = _time_call(
+            lambda: split_by_project_and_component(df, PROJECT_COL, output_dir), args.repeat)
+
+        chart_functions = {
+            'generate_reports_per_component_bar': graphs.generate_reports_per_component_bar,
+            'generate_resolution_pie': graphs.generate_resolution_pie,
+            'generate_grouped_bar_chart[Priority]': lambda d: graphs.generate_grouped_bar_chart(d, 'Priority'),
+            'generate_grouped_bar_chart[Severity]': lambda d: graphs.generate_grouped_bar_chart(d, 'Severity'),
+            'generate_reports_over_time_line': graphs.generate_reports_over_time_line,
+        }
+        project_dfs = {project: df.take(positions) for project, positions in
+                       df.groupby(PROJECT_COL, observed=True, sort=False).indices.items()}
+        project_graphs = {project: {} for project in project_dfs}
+        for chart_name, chart_function in chart_functions.items():
+            def render_all():
+                return {project: chart_function(project_df) for project, project_df in project_dfs.items()}
+            rendered, timings[chart_name] = _time_call(render_all, args.repeat)
+            for project, image in rendered.items():
+                project_graphs[project][chart_name] = image
+
+        telemetry = RunTelemetry()
+        autotuner = Autotuner() if args.autotune else None
+        summaries = None
+        if not args.skip_llm:
+            if args.warm_up:
+                warm_up_model(args.model, backend=backend, keep_alive=args.keep_alive, telemetry=telemetry)
+            summaries, timings['generate_summary_table'] = _time_call(
+                lambda: generate_summary_table(df, project_component_rows, PROJECT_COL, args.model, args.chunk_size,
+                                               telemetry=telemetry, backend=backend,
+                                               structured_output=args.structured, keep_alive=args.keep_alive,
+                                               overall_from_components=args.hierarchical,
+                                               batch_threshold=args.batch_threshold, autotuner=autotuner,
+                                               early_exit=args.early_exit), 1)
+        else:
+            summaries = ({project: {} for project in project_dfs}, {})
+
+        _, timings['build_html_report'] = _time_call(
+            lambda: build_html_report(summaries[0], summaries[1], project_graphs, output_dir), args.repeat)
+    finally:
+        backend.close()
+        mock.stop()
+
+    return {
+        'meta': {
+            'commit': _git_commit(),
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'params': vars(args),
+            'reports_after_explode': len(df),
+        },
+        'timings': timings,
+        'memory': memory,
+        'llm': telemetry.to_dict()['totals'],
+        'autotune': autotuner.summary() if autotuner is not None else None,
+    }
+
+
+def compare_results(current, baseline):
+    """Prints a per-stage comparison of median timings against a previous result file."""
+    base_commit = baseline.get('meta', {}).get('commit')
+    print(f"\nComparison against {base_commit or 'baseline'}:")
+    print(f"{'stage':45} {'baseline':>10} {'current':>10} {'change':>9}")
+    for name, timing in current['timings'].items():
+        base = baseline.get('timings', {}).get(name)
+        if not base:
+            print(f"{name:45} {'-':>10} {timing['median_s']:>9.3f}s {'new':>9}")
+            continue
+        change = (timing['median_s'] - base['median_s']) / base['median_s'] * 100 if base['median_s'] else 0.0
+        print(f"{name:45} {base['median_s']:>9.3f}s {timing['median_s']:>9.3f}s {change:>+8.1f}%")
+    if current.get('memory') and baseline.get('memory'):
+        base_mb, current_mb = baseline['memory']['peak_rss_mb'], current['memory']['peak_rss_mb']
+        print(f"{'peak RSS (data pipeline)':45} {base_mb:>8.1f}MB {current_mb:>8.1f}MB "
+              f"{(current_mb - base_mb) / base_mb * 100:>+8.1f}%")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark the bug report summarizer pipeline.')
+    parser.add_argument('--rows', type=int, default=2000, help='Number of rows in the synthetic export.')
+    parser.add_argument('--projects', type=int, default=20, help='Number of distinct project codes.')
+    parser.add_argument('--components', type=int, default=6, help='Components per project.')
+    parser.add_argument('--multi-project-rate', type=float, default=0.1,
+                        help='Fraction of reports that belong to two projects.')
+    parser.add_argument('--multi-component-rate', type=float, default=0.2,
+                        help='Fraction of reports that list two components.')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--repeat', type=int, default=3, help='Repetitions for the non-LLM stages.')
+    parser.add_argument('--latency', type=float, default=0.02, help='Mock Ollama time to first token, in seconds.')
+    parser.add_argument('--tokens-per-sec', type=float, default=2000.0, help='Mock Ollama generation speed.')
+    parser.add_argument('--load-time', type=float, default=0.0, help='Mock Ollama model load time, in seconds.')
+    parser.add_argument('--prompt-tokens-per-sec', type=float, default=0.0,
+                        help='Mock Ollama prompt evaluation speed for uncached prompt tokens (0 = instant).')
+    parser.add_argument('--parallel', type=int, default=1,
+                        help='Requests the mock server processes at once; the rest queue.')
+    parser.add_argument('--warm-up', action='store_true', help='Preload the model before the summaries.')
+    parser.add_argument('--keep-alive', help="keep_alive passed with every request, e.g. '30m'.")
+    parser.add_argument('--engine', choices=['pandas', 'arrow'], default='pandas',
+                        help='Data engine for loading and chart aggregations.')
+    parser.add_argument('--model', default='llama3.1:8b')
+    parser.add_argument('--chunk-size', type=int, default=25)
+    parser.add_argument('--autotune', action='store_true',
+                        help='Let the autotuner pick chunk size and requests in flight (ignores --chunk-size).')
+    parser.add_argument('--startup', action='store_true',
+                        help='Also measure GUI time-to-first-window (requires a display).')
+    parser.add_argument('--structured', action='store_true', help='Use structured JSON output for summaries.')
+    parser.add_argument('--hierarchical', action='store_true',
+                        help='Build overall project summaries from the component summaries.')
+    parser.add_argument('--batch-threshold', type=int, default=0,
+                        help='Batch components with at most this many reports into shared requests (0 = off).')
+    parser.add_argument('--early-exit', action='store_true',
+                        help='Only screen the remaining reports once a chunked summary stops changing.')
+    parser.add_argument('--skip-llm', action='store_true', help='Do not time generate_summary_table.')
+    parser.add_argument('--memory', action='store_true',
+                        help='Also measure peak RSS of the data pipeline in a fresh process.')
+    parser.add_argument('--rss-probe', metavar='CSV', help=argparse.SUPPRESS)
+    parser.add_argument('--output', help='Write the JSON results to this path.')
+    parser.add_argument('--compare', help='A previous JSON result file to compare against.')
+    args = parser.parse_args(argv)
+
+    if args.rss_probe:
+        _rss_probe(args.rss_probe, args.engine)
+        return 0
+
+    results = run_benchmarks(args)
+
+    for name, timing in results['timings'].items():
+        print(f"{name:45} median {timing['median_s']:.3f}s  (min {timing['min_s']:.3f}s, {timing['runs']} runs)")
+    print(f"LLM calls: {results['llm']['llm_calls']}, prompt tokens: {results['llm']['prompt_eval_count']}, "
+          f"eval tokens: {results['llm']['eval_count']}")
+    if results['memory']:
+        print(f"Peak RSS of the data pipeline: {results['memory']['peak_rss_mb']:.1f} MB")
+    if results['autotune']:
+        print(f"Autotune settled on chunk size {results['autotune']['chunk_size']} with "
+              f"{results['autotune']['concurrency']} request(s) in flight")
+    print(f"TTFT: first call {results['llm']['ttft_first_s']:.3f}s, mean {results['llm']['ttft_mean_s']:.3f}s")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+        print(f"Results written to {args.output}")
+
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            compare_results(results, json.load(f))
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
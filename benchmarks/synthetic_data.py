@@ -0,0 +1,60 @@
+import csv
+import random
+from datetime import datetime, timedelta
+
+# Columns and value pools shaped like a real Jira export (see project_data.csv).
+COLUMNS = ['Key', 'Summary', 'Resolution', 'Priority', 'Severity', 'Project List', 'Status', 'Created', 'Component/s']
+RESOLUTIONS = ['Fixed', 'Duplicate', "Won't Fix", 'Cannot Reproduce', 'Done', '']
+PRIORITIES = ['Minor', 'Major', 'High', 'Critical', 'Blocker']
+SEVERITIES = ['Low', 'Medium', 'High', 'Critical']
+STATUSES = ['Open', 'In Progress', 'Resolved', 'Closed']
+COMPONENT_NAMES = ['SC', 'FW', 'APP', 'BLE', 'WIFI', 'UI', 'PWR', 'MOTOR', 'SENSOR', 'OTA', 'NAV', 'AUDIO']
+SUMMARY_WORDS = [
+    'incorrect', 'LED', 'behavior', 'crash', 'after', 'OTA', 'update', 'pairing', 'fails', 'battery', 'drain',
+    'when', 'idle', 'filter', 'removed', 'error', 'code', 'not', 'shown', 'app', 'disconnects', 'during',
+    'cleaning', 'sensor', 'reading', 'wrong', 'timeout', 'on', 'startup', 'motor', 'stalls', 'intermittently',
+]
+
+
+def _project_codes(num_projects):
+    return [str(590 + i * 10) for i in range(num_projects)]
+
+
+def generate_export(path, rows=1000, projects=10, components_per_project=5, multi_project_rate=0.1,
+                    multi_component_rate=0.2, seed=0):
+    """
+    Writes a synthetic Jira export CSV with the same columns as project_data.csv.
+    multi_project_rate and multi_component_rate are the fraction of rows that list more
+    than one project ("590, 620") or more than one component ("590_SC, 590_FW").
+    """
+    rng = random.Random(seed)
+    project_codes = _project_codes(projects)
+    component_pool = [COMPONENT_NAMES[i % len(COMPONENT_NAMES)] + ('' if i < len(COMPONENT_NAMES) else str(i))
+                      for i in range(max(components_per_project, 1))]
+    start_date = datetime(2022, 1, 1)
+
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(COLUMNS)
+        for i in range(rows):
+            row_projects = [rng.choice(project_codes)]
+            if projects > 1 and rng.random() < multi_project_rate:
+                row_projects.append(rng.choice([p for p in project_codes if p != row_projects[0]]))
+
+            component_count = 2 if rng.random() < multi_component_rate else 1
+            row_components = rng.sample(component_pool, min(component_count, len(component_pool)))
+            component_value = ', '.join(f'{row_projects[0]}_{comp}' for comp in row_components)
+
+            created = start_date + timedelta(minutes=rng.randint(0, 60 * 24 * 900))
+            writer.writerow([
+                f'ESW-{10000 + i}',
+                ' '.join(rng.choices(SUMMARY_WORDS, k=rng.randint(6, 14))).capitalize(),
+                rng.choice(RESOLUTIONS),
+                rng.choice(PRIORITIES),
+                rng.choice(SEVERITIES),
+                ', '.join(row_projects),
+                rng.choice(STATUSES),
+                f'{created.month}/{created.day}/{created.year} {created.hour}:{created.minute:02d}',
+                component_value,
+            ])
+    return path
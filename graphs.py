@@ -8,6 +8,8 @@ import matplotlib.pyplot as plt
 import base64
 from io import BytesIO
 
+import arrow_engine
+
 # --- TROUBLESHOOTING ---
 # Set this to True to display each chart in a pop-up window as it's created.
 SHOW_CHARTS_FOR_DEBUG = False
@@ -29,8 +31,11 @@ def generate_reports_per_component_bar(project_df):
     if 'All_Components_List' not in project_df.columns:
         return ""
 
-    component_counts = project_df.explode('All_Components_List')['All_Components_List'].value_counts().reset_index()
-    component_counts.columns = ['Component', 'Count']
+    if arrow_engine.is_arrow_frame(project_df):
+        component_counts = arrow_engine.component_counts(project_df)
+    else:
+        component_counts = project_df.explode('All_Components_List')['All_Components_List'].value_counts().reset_index()
+        component_counts.columns = ['Component', 'Count']
 
     plt.figure(figsize=(10, 6))
     ax = sns.barplot(
@@ -53,7 +58,12 @@ def generate_reports_per_component_bar(project_df):
 
 def generate_resolution_pie(project_df):
     """Generates a pie chart of report resolutions with an external legend."""
-    resolution_counts = project_df['Resolution'].value_counts()
+    if arrow_engine.is_arrow_frame(project_df):
+        resolution_counts = arrow_engine.value_counts(project_df, 'Resolution')
+    else:
+        resolution_counts = project_df['Resolution'].value_counts()
+    # Categorical columns also count categories that don't occur in this project.
+    resolution_counts = resolution_counts[resolution_counts > 0]
 
     colors = sns.color_palette('plasma', len(resolution_counts))
 
@@ -89,9 +99,12 @@ def generate_grouped_bar_chart(project_df, group_col):
     if 'All_Components_List' not in project_df.columns:
         return ""
 
-    data = project_df.explode('All_Components_List').groupby(['All_Components_List', group_col]).size().reset_index(
-        name='Count')
-    data.rename(columns={'All_Components_List': 'Component'}, inplace=True)
+    if arrow_engine.is_arrow_frame(project_df):
+        data = arrow_engine.component_group_counts(project_df, group_col)
+    else:
+        data = project_df.explode('All_Components_List').groupby(
+            ['All_Components_List', group_col], observed=True).size().reset_index(name='Count')
+        data.rename(columns={'All_Components_List': 'Component'}, inplace=True)
 
     category_orders = {
         "Priority": ["Minor", "Major", "High", "Critical", "Blocker"],
@@ -123,11 +136,12 @@ def generate_reports_over_time_line(project_df):
     if 'Created' not in project_df.columns:
         return ""
 
-    df_time = project_df.copy()
-
-    monthly_counts = df_time.groupby(
-        pd.Grouper(key='Created', freq=pd.offsets.MonthEnd())
-    ).size().reset_index(name='Count')
+    if arrow_engine.is_arrow_frame(project_df):
+        monthly_counts = arrow_engine.monthly_counts(project_df)
+    else:
+        monthly_counts = project_df.groupby(
+            pd.Grouper(key='Created', freq=pd.offsets.MonthEnd())
+        ).size().reset_index(name='Count')
 
     plt.figure(figsize=(12, 6))
     ax = sns.lineplot(
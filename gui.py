@@ -1,34 +1,65 @@
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox
-import pandas as pd
-import ollama
 import threading
+import queue
+import glob
+import os
 import sys
 import webbrowser
-from preprocess import load_and_preprocess, split_by_project_and_component
-from ollama_functions import generate_summary_table
-from webpage import build_html_report
-from graphs import (
-    generate_reports_per_component_bar,
-    generate_resolution_pie,
-    generate_grouped_bar_chart,
-    generate_reports_over_time_line,
-)
+from importlib.util import find_spec
+from llm_backends import BACKEND_TYPES, DEFAULT_OLLAMA_HOST, DEFAULT_OPENAI_BASE_URL, create_backend
+
+# pandas, matplotlib/seaborn, markdown and the LLM client are imported where they are first
+# used rather than here, so the window can appear before those (slow) imports have run.
+
+
+# --- Log window settings ---
+MAX_LOG_LINES = 2000  # Oldest lines are dropped once the log holds this many.
+LOG_POLL_INTERVAL_MS = 100  # How often the Tk loop drains queued output into the log.
+MAX_LOG_WRITES_PER_POLL = 1000  # Caps the work done per drain so the UI stays responsive.
 
 
 class StdoutRedirector:
-    """Redirects console output to a tkinter Text widget."""
+    """
+    Redirects console output to a tkinter Text widget. write() may be called from any thread;
+    it only queues the text, and the Tk loop inserts it in batches via drain().
+    """
 
-    def __init__(self, text_widget):
+    def __init__(self, text_widget, max_lines=MAX_LOG_LINES):
         self.text_widget = text_widget
+        self.max_lines = max_lines
+        self.queue = queue.SimpleQueue()
 
     def write(self, string):
-        self.text_widget.insert(tk.END, string)
-        self.text_widget.see(tk.END)
+        if string:
+            self.queue.put(string)
 
     def flush(self):
         pass
 
+    def drain(self):
+        """Moves queued output into the widget and trims it to the newest max_lines lines. Tk thread only."""
+        pieces = []
+        try:
+            while len(pieces) < MAX_LOG_WRITES_PER_POLL:
+                pieces.append(self.queue.get_nowait())
+        except queue.Empty:
+            pass
+        if not pieces:
+            return
+
+        text = ''.join(pieces)
+        # A single burst longer than the whole buffer only needs its tail.
+        lines = text.split('\n')
+        if len(lines) > self.max_lines:
+            text = '\n'.join(lines[-self.max_lines:])
+
+        self.text_widget.insert(tk.END, text)
+        line_count = int(self.text_widget.index('end-1c').split('.')[0])
+        if line_count > self.max_lines:
+            self.text_widget.delete('1.0', f'{line_count - self.max_lines + 1}.0')
+        self.text_widget.see(tk.END)
+
 
 class BugReportGUI(tk.Tk):
     """The main GUI for the Bug Report Summarizer application."""
@@ -39,9 +70,12 @@ class BugReportGUI(tk.Tk):
         self.geometry("800x850")  # Increased height for sort options
         self.csv_path = None
         self.model_map = {}
+        self.backend = None
+        self.retired_backends = []  # Replaced while a report was running; closed once it finishes.
+        self.processing = False
         self.cancel_event = threading.Event()
         self.output_path = os.path.join(os.getcwd(), "bug_report_summary.html")
-        self.projects_data = []  # To store detailed project info for sorting
+        self.projects_data = []  # To store detailed project info for sorting and filtering
 
         # --- Main Frame ---
         main_frame = ttk.Frame(self, padding="10")
@@ -52,6 +86,8 @@ class BugReportGUI(tk.Tk):
         file_frame.pack(fill=tk.X, padx=5, pady=5, side=tk.TOP)
         self.file_path_label = ttk.Label(file_frame, text="No file selected.")
         self.file_path_label.pack(side=tk.LEFT, padx=5, pady=5)
+        self.select_folder_button = ttk.Button(file_frame, text="Select Folder", command=self.select_csv_folder)
+        self.select_folder_button.pack(side=tk.RIGHT, padx=5, pady=5)
         self.select_button = ttk.Button(file_frame, text="Select CSV", command=self.select_csv)
         self.select_button.pack(side=tk.RIGHT, padx=5, pady=5)
 
@@ -69,13 +105,21 @@ class BugReportGUI(tk.Tk):
         self.component_col_dropdown = ttk.Combobox(column_frame, textvariable=self.component_col_var, state="readonly")
         self.component_col_dropdown.pack(side=tk.LEFT, padx=5, pady=5)
         self.component_col_dropdown.bind("<<ComboboxSelected>>", self.on_column_selection_change)
+        ttk.Label(column_frame, text="Data Engine:").pack(side=tk.LEFT, padx=5, pady=5)
+        self.engine_var = tk.StringVar(value='pandas')
+        # Only offer the Arrow engine when pyarrow is installed (checked without importing it).
+        engines = ['pandas', 'arrow'] if find_spec('pyarrow') is not None else ['pandas']
+        ttk.Combobox(column_frame, textvariable=self.engine_var, values=engines, state="readonly",
+                     width=8).pack(side=tk.LEFT, padx=5, pady=5)
 
         # --- Log Window ---
         log_frame = ttk.LabelFrame(main_frame, text="Log")
         log_frame.pack(fill=tk.BOTH, expand=True, padx=5, pady=5, side=tk.BOTTOM)
         self.log_text = tk.Text(log_frame, wrap=tk.WORD, height=10, background="#f1f3f6")
         self.log_text.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
-        sys.stdout = StdoutRedirector(self.log_text)
+        self.stdout_redirector = StdoutRedirector(self.log_text)
+        sys.stdout = self.stdout_redirector
+        self.after(LOG_POLL_INTERVAL_MS, self._pump_log)
 
         # --- Progress Bar and Status Label ---
         progress_frame = ttk.Frame(main_frame)
@@ -104,24 +148,74 @@ class BugReportGUI(tk.Tk):
         self.output_path_label.pack(side=tk.LEFT, padx=5, pady=5)
         self.output_select_button = ttk.Button(output_frame, text="Save As...", command=self.select_output_path)
         self.output_select_button.pack(side=tk.RIGHT, padx=5, pady=5)
+        # With a service URL, reports are generated by a running report_service.py instead of here.
+        service_row = ttk.Frame(output_frame)
+        service_row.pack(side=tk.BOTTOM, fill=tk.X, before=self.output_path_label)
+        ttk.Label(service_row, text="Report Service URL (blank to run here):").pack(side=tk.LEFT, padx=5, pady=5)
+        self.service_url_var = tk.StringVar(value=os.environ.get('REPORT_SERVICE_URL', ''))
+        ttk.Entry(service_row, textvariable=self.service_url_var).pack(side=tk.LEFT, fill=tk.X, expand=True,
+                                                                      padx=5, pady=5)
 
         # --- Ollama Model Selection ---
-        ollama_frame = ttk.LabelFrame(main_frame, text="5. Select Ollama Model")
+        ollama_frame = ttk.LabelFrame(main_frame, text="5. Select LLM Backend and Model")
         ollama_frame.pack(fill=tk.X, padx=5, pady=5, side=tk.BOTTOM)
+        backend_frame = ttk.Frame(ollama_frame)
+        backend_frame.pack(fill=tk.X)
+        ttk.Label(backend_frame, text="Backend:").pack(side=tk.LEFT, padx=5, pady=5)
+        self.backend_type_var = tk.StringVar(value=BACKEND_TYPES[0])
+        self.backend_type_dropdown = ttk.Combobox(backend_frame, textvariable=self.backend_type_var,
+                                                  values=BACKEND_TYPES, state="readonly", width=22)
+        self.backend_type_dropdown.pack(side=tk.LEFT, padx=5, pady=5)
+        self.backend_type_dropdown.bind("<<ComboboxSelected>>", self.on_backend_type_change)
+        ttk.Label(backend_frame, text="Server URL / Directory:").pack(side=tk.LEFT, padx=5, pady=5)
+        self.backend_location_var = tk.StringVar(value=os.environ.get('OLLAMA_HOST', DEFAULT_OLLAMA_HOST))
+        self.connect_button = ttk.Button(backend_frame, text="Connect", command=self.load_ollama_models)
+        self.connect_button.pack(side=tk.RIGHT, padx=5, pady=5)
+        ttk.Entry(backend_frame, textvariable=self.backend_location_var).pack(side=tk.LEFT, fill=tk.X, expand=True,
+                                                                             padx=5, pady=5)
         self.ollama_model_var = tk.StringVar()
         self.ollama_model_dropdown = ttk.Combobox(ollama_frame, textvariable=self.ollama_model_var, state="readonly")
         self.ollama_model_dropdown.pack(fill=tk.X, padx=5, pady=5)
-        self.load_ollama_models()
+        # Start model discovery once the event loop is running, so the window is never held up by it.
+        self.after_idle(self.load_ollama_models)
 
         # --- AI Summary Options ---
         summary_options_frame = ttk.LabelFrame(main_frame, text="4. AI Summary Options")
         summary_options_frame.pack(fill=tk.X, padx=5, pady=5, side=tk.BOTTOM)
-        ttk.Label(summary_options_frame, text="Chunk Size:").pack(side=tk.LEFT, padx=5, pady=5)
+        summary_options_row = ttk.Frame(summary_options_frame)
+        summary_options_row.pack(fill=tk.X)
+        summary_toggles_row = ttk.Frame(summary_options_frame)
+        summary_toggles_row.pack(fill=tk.X)
+        ttk.Label(summary_options_row, text="Chunk Size:").pack(side=tk.LEFT, padx=5, pady=5)
         self.chunk_size_var = tk.StringVar()
-        self.chunk_size_dropdown = ttk.Combobox(summary_options_frame, textvariable=self.chunk_size_var, width=18)
-        self.chunk_size_dropdown['values'] = ['5', '10', '25', '50', 'Process All at Once']
+        self.chunk_size_dropdown = ttk.Combobox(summary_options_row, textvariable=self.chunk_size_var, width=18)
+        self.chunk_size_dropdown['values'] = ['Auto', '5', '10', '25', '50', 'Process All at Once']
         self.chunk_size_dropdown.set('5')
         self.chunk_size_dropdown.pack(side=tk.LEFT, padx=5, pady=5)
+        ttk.Label(summary_options_row, text="Keep Model Loaded:").pack(side=tk.LEFT, padx=5, pady=5)
+        self.keep_alive_var = tk.StringVar(value='30m')
+        self.keep_alive_dropdown = ttk.Combobox(summary_options_row, textvariable=self.keep_alive_var, width=6)
+        self.keep_alive_dropdown['values'] = ['5m', '30m', '1h', '-1']
+        self.keep_alive_dropdown.pack(side=tk.LEFT, padx=5, pady=5)
+        ttk.Label(summary_options_row, text="Batch Components Up To:").pack(side=tk.LEFT, padx=5, pady=5)
+        self.batch_threshold_var = tk.StringVar(value='Off')
+        self.batch_threshold_dropdown = ttk.Combobox(summary_options_row, textvariable=self.batch_threshold_var,
+                                                     width=6)
+        self.batch_threshold_dropdown['values'] = ['Off', '1', '2', '3', '5']
+        self.batch_threshold_dropdown.pack(side=tk.LEFT, padx=5, pady=5)
+        ttk.Label(summary_options_row, text="reports").pack(side=tk.LEFT, pady=5)
+        self.structured_output_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(summary_toggles_row, text="Structured JSON output",
+                        variable=self.structured_output_var).pack(side=tk.LEFT, padx=5, pady=5)
+        self.overall_from_components_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(summary_toggles_row, text="Overall summary from component summaries",
+                        variable=self.overall_from_components_var).pack(side=tk.LEFT, padx=5, pady=5)
+        self.early_exit_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(summary_toggles_row, text="Skip refinement once summaries settle",
+                        variable=self.early_exit_var).pack(side=tk.LEFT, padx=5, pady=5)
+        self.transcript_to_file_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(summary_toggles_row, text="LLM responses to log file",
+                        variable=self.transcript_to_file_var).pack(side=tk.LEFT, padx=5, pady=5)
 
         # --- Project Selection and Sorting ---
         project_frame = ttk.LabelFrame(main_frame, text="3. Select Projects to Process")
@@ -148,19 +242,46 @@ class BugReportGUI(tk.Tk):
         ttk.Radiobutton(sort_frame, text="Ascending", variable=self.sort_order_var, value="asc",
                         command=self.sort_and_redisplay_projects).pack(side=tk.LEFT)
 
-        # --- Scrollable project list ---
-        canvas_container = ttk.Frame(project_frame)
-        canvas_container.pack(fill=tk.BOTH, expand=True)
-        canvas = tk.Canvas(canvas_container, borderwidth=0, background="#ffffff")
-        self.scrollable_content_frame = ttk.Frame(canvas)
-        scrollbar = ttk.Scrollbar(canvas_container, orient="vertical", command=canvas.yview)
-        canvas.configure(yscrollcommand=scrollbar.set)
+        # --- Filter and bulk selection controls ---
+        filter_frame = ttk.Frame(project_frame)
+        filter_frame.pack(fill=tk.X, padx=5, pady=(0, 5))
+        ttk.Label(filter_frame, text="Filter:").pack(side=tk.LEFT, padx=(0, 5))
+        self.project_filter_var = tk.StringVar()
+        self.project_filter_var.trace_add("write", self.on_project_filter_change)
+        ttk.Entry(filter_frame, textvariable=self.project_filter_var, width=30).pack(side=tk.LEFT)
+        ttk.Button(filter_frame, text="Select Shown", command=lambda: self.set_shown_projects_selected(True)).pack(
+            side=tk.LEFT, padx=(10, 5))
+        ttk.Button(filter_frame, text="Deselect Shown", command=lambda: self.set_shown_projects_selected(False)).pack(
+            side=tk.LEFT)
+        self.selection_count_label = ttk.Label(filter_frame, text="")
+        self.selection_count_label.pack(side=tk.RIGHT, padx=5)
+
+        # --- Project list ---
+        # A Treeview only draws the rows that are scrolled into view, so it stays fast with thousands
+        # of projects, and sorting/filtering just moves or detaches existing rows.
+        tree_container = ttk.Frame(project_frame)
+        tree_container.pack(fill=tk.BOTH, expand=True)
+        self.project_tree = ttk.Treeview(tree_container, columns=("selected", "project", "reports", "components",
+                                                                  "preview"), show="headings", selectmode="extended")
+        for column, heading, width, stretch in (("selected", "", 30, False), ("project", "Project", 120, False),
+                                                ("reports", "Reports", 70, False),
+                                                ("components", "Components", 90, False),
+                                                ("preview", "Components Preview", 300, True)):
+            self.project_tree.heading(column, text=heading)
+            self.project_tree.column(column, width=width, stretch=stretch,
+                                     anchor="center" if column == "selected" else "w")
+        scrollbar = ttk.Scrollbar(tree_container, orient="vertical", command=self.project_tree.yview)
+        self.project_tree.configure(yscrollcommand=scrollbar.set)
         scrollbar.pack(side="right", fill="y")
-        canvas.pack(side="left", fill="both", expand=True)
-        canvas_frame_id = canvas.create_window((0, 0), window=self.scrollable_content_frame, anchor="nw")
-        self.scrollable_content_frame.bind("<Configure>", lambda e: canvas.configure(scrollregion=canvas.bbox("all")))
-        canvas.bind('<Configure>', lambda e: canvas.itemconfig(canvas_frame_id, width=e.width))
-        self.project_vars = {}
+        self.project_tree.pack(side="left", fill="both", expand=True)
+        self.project_tree.bind("<Button-1>", self.on_project_tree_click)
+        self.project_tree.bind("<space>", self.on_project_tree_space)
+        self.selected_projects = set()
+        self._filter_after_id = None
+
+    def _pump_log(self):
+        self.stdout_redirector.drain()
+        self.after(LOG_POLL_INTERVAL_MS, self._pump_log)
 
     def on_column_selection_change(self, event=None):
         self.load_projects_and_components()
@@ -168,11 +289,24 @@ class BugReportGUI(tk.Tk):
     def select_csv(self):
         file_path = filedialog.askopenfilename(filetypes=[("CSV files", "*.csv")])
         if file_path:
-            self.file_path_label.config(text=os.path.basename(file_path))
-            self.csv_path = file_path
-            self.load_csv_columns()
-            self.load_projects_and_components()
-            self.process_button.config(state=tk.NORMAL)
+            self.set_csv_source(file_path, os.path.basename(file_path))
+
+    def select_csv_folder(self):
+        """Uses every *.csv export in a folder, e.g. the pages of a large Jira export."""
+        folder = filedialog.askdirectory(title="Select Folder of CSV Exports")
+        if folder:
+            csv_count = len(glob.glob(os.path.join(folder, '*.csv')))
+            if not csv_count:
+                messagebox.showerror("Error", f"No CSV files found in '{folder}'.")
+                return
+            self.set_csv_source(folder, f"{os.path.basename(folder)}/ ({csv_count} CSV files)")
+
+    def set_csv_source(self, csv_path, label):
+        self.file_path_label.config(text=label)
+        self.csv_path = csv_path
+        self.load_csv_columns()
+        self.load_projects_and_components()
+        self.process_button.config(state=tk.NORMAL)
 
     def select_output_path(self):
         file_path = filedialog.asksaveasfilename(
@@ -184,8 +318,11 @@ class BugReportGUI(tk.Tk):
             self.output_path_label.config(text=self.output_path)
 
     def load_csv_columns(self):
+        import pandas as pd
+        from preprocess import resolve_csv_paths
         try:
-            df = pd.read_csv(self.csv_path, nrows=1)
+            # Exports of one project share a header, so the first file's columns stand for all.
+            df = pd.read_csv(resolve_csv_paths(self.csv_path)[0], nrows=1)
             columns = list(df.columns)
             self.project_col_dropdown['values'] = columns
             self.component_col_dropdown['values'] = columns
@@ -201,10 +338,11 @@ class BugReportGUI(tk.Tk):
         component_col = self.component_col_var.get()
         if not (self.csv_path and project_col and component_col): return
 
+        from preprocess import read_source
         try:
             print("Loading and preprocessing data for project list...")
             # Use a simplified version of the main preprocessor for speed
-            df = pd.read_csv(self.csv_path, usecols=[project_col, component_col], low_memory=False)
+            df = read_source(self.csv_path, [project_col, component_col], usecols=[project_col, component_col])
             df.dropna(subset=[project_col], inplace=True)
             df[project_col] = df[project_col].astype(str).apply(lambda x: [p.strip() for p in x.split(',')])
             df = df.explode(project_col)
@@ -222,89 +360,188 @@ class BugReportGUI(tk.Tk):
             for name, group in grouped:
                 if not name: continue
                 all_comps = group.explode('components')['components'].unique()
+                sorted_comps = sorted(str(c) for c in all_comps)
                 self.projects_data.append({
                     'name': name,
                     'report_count': len(group),
                     'component_count': len(all_comps),
-                    'components_preview': ", ".join(sorted(list(all_comps))[:3]),
-                    'variable': tk.BooleanVar(value=True)
+                    'components_preview': ", ".join(sorted_comps[:3]),
+                    'search_text': f"{name} {' '.join(sorted_comps)}".lower(),
                 })
             print("Finished processing data.")
-            self.sort_and_redisplay_projects()
+            self.populate_project_tree()
 
         except Exception as e:
             messagebox.showerror("Error", f"Failed to load projects: {e}")
 
+    def populate_project_tree(self):
+        """Replaces the project list with self.projects_data, with every project selected."""
+        self.project_tree.delete(*self.project_tree.get_children())
+        self.selected_projects = {proj['name'] for proj in self.projects_data}
+        for proj in self.projects_data:
+            preview = proj['components_preview'] + (', ...' if proj['component_count'] > 3 else '')
+            self.project_tree.insert("", tk.END, iid=proj['name'], values=(
+                "\u2611", proj['name'], proj['report_count'], proj['component_count'], preview))
+        self.sort_and_redisplay_projects()
+
     def sort_and_redisplay_projects(self):
+        """Sorts and filters the existing rows in place; no rows are recreated."""
         key = self.sort_by_var.get()
         is_reverse = self.sort_order_var.get() == "desc"
         self.projects_data.sort(key=lambda x: x[key], reverse=is_reverse)
 
-        for widget in self.scrollable_content_frame.winfo_children():
-            widget.destroy()
-
-        self.project_vars = {}
+        filter_text = self.project_filter_var.get().strip().lower()
+        shown_index = 0
+        hidden = []
         for proj in self.projects_data:
-            self.project_vars[proj['name']] = proj['variable']
-            label = (f"{proj['name']} (Reports: {proj['report_count']}, Components: {proj['component_count']}) "
-                     f"- [{proj['components_preview']}{', ...' if proj['component_count'] > 3 else ''}]")
-            ttk.Checkbutton(self.scrollable_content_frame, text=label, variable=proj['variable']).pack(anchor="w",
-                                                                                                       padx=5, pady=2)
+            if filter_text and filter_text not in proj['search_text']:
+                hidden.append(proj['name'])
+                continue
+            # move() also re-attaches rows hidden by an earlier filter.
+            self.project_tree.move(proj['name'], "", shown_index)
+            shown_index += 1
+        if hidden:
+            self.project_tree.detach(*hidden)
+        self.update_selection_count()
+
+    def on_project_filter_change(self, *args):
+        # Wait for a short pause in typing before re-filtering.
+        if self._filter_after_id is not None:
+            self.after_cancel(self._filter_after_id)
+        self._filter_after_id = self.after(150, self._apply_project_filter)
+
+    def _apply_project_filter(self):
+        self._filter_after_id = None
+        self.sort_and_redisplay_projects()
+
+    def set_projects_selected(self, names, selected):
+        for name in names:
+            if selected:
+                self.selected_projects.add(name)
+            else:
+                self.selected_projects.discard(name)
+            self.project_tree.set(name, "selected", "\u2611" if selected else "\u2610")
+        self.update_selection_count()
+
+    def set_shown_projects_selected(self, selected):
+        self.set_projects_selected(self.project_tree.get_children(), selected)
+
+    def toggle_projects(self, names):
+        to_select = [name for name in names if name not in self.selected_projects]
+        to_deselect = [name for name in names if name in self.selected_projects]
+        self.set_projects_selected(to_select, True)
+        self.set_projects_selected(to_deselect, False)
+
+    def on_project_tree_click(self, event):
+        if self.project_tree.identify_region(event.x, event.y) != "cell":
+            return
+        row = self.project_tree.identify_row(event.y)
+        if row and self.project_tree.identify_column(event.x) == "#1":
+            self.toggle_projects([row])
+
+    def on_project_tree_space(self, event=None):
+        self.toggle_projects(self.project_tree.selection())
+
+    def update_selection_count(self):
+        self.selection_count_label.config(
+            text=f"{len(self.selected_projects)} of {len(self.projects_data)} selected "
+                 f"({len(self.project_tree.get_children())} shown)")
+
+    def on_backend_type_change(self, event=None):
+        default_locations = {
+            'Ollama': os.environ.get('OLLAMA_HOST', DEFAULT_OLLAMA_HOST),
+            'OpenAI-compatible': DEFAULT_OPENAI_BASE_URL,
+            'Replay from disk': 'llm_recordings',
+            'Ollama (record to disk)': 'llm_recordings',
+        }
+        self.backend_location_var.set(default_locations.get(self.backend_type_var.get(), ''))
 
     def _bytes_to_gb(self, bytes_size):
         if not bytes_size: return "0.0 GB"
         return f"{bytes_size / (1024 ** 3):.1f} GB"
 
     def load_ollama_models(self):
+        """Discovers the backend's models on a background thread so a slow server never blocks the window."""
+        backend_type = self.backend_type_var.get()
+        # For the replay backends the entry holds the recordings directory instead of a URL.
+        location = self.backend_location_var.get().strip() or None
+
+        self.ollama_model_var.set("Discovering models...")
+        self.ollama_model_dropdown['values'] = []
+        self.connect_button.config(state=tk.DISABLED)
+        threading.Thread(target=self._discover_models, args=(backend_type, location), daemon=True).start()
+
+    def _discover_models(self, backend_type, location):
         try:
-            self.model_map = {}
-            # Descriptions for specific models as requested
-            model_descriptions = {
-                "llama3.1:8b": " (Preferred for fast responses)",
-                "llama3.3:70b-instruct-q2_K": " (Preferred for accurate responses)"
-            }
-
-            response = ollama.list()
-            models_list = response.get('models', [])
-            if not models_list:
-                messagebox.showwarning("Warning", "No Ollama models found on the server.")
-                return
+            backend = create_backend(backend_type, location)
+            models_list = backend.list_models()
+            self.after(0, self._populate_models, backend, models_list)
+        except Exception as e:
+            self.after(0, self._model_discovery_failed, e)
+
+    def _model_discovery_failed(self, error):
+        self.ollama_model_var.set("")
+        if not self.processing:
+            self.connect_button.config(state=tk.NORMAL)
+        messagebox.showerror("Error", f"Failed to connect to the LLM backend: {error}")
+
+    def _populate_models(self, backend, models_list):
+        if self.backend is not None:
+            # A report started before discovery finished may still be using the old backend.
+            if self.processing:
+                self.retired_backends.append(self.backend)
+            else:
+                self.backend.close()
+        self.backend = backend
+        if not self.processing:
+            self.connect_button.config(state=tk.NORMAL)
+        self.model_map = {}
+        self.ollama_model_var.set("")
+        # Descriptions for specific models as requested
+        model_descriptions = {
+            "llama3.1:8b": " (Preferred for fast responses)",
+            "llama3.3:70b-instruct-q2_K": " (Preferred for accurate responses)"
+        }
 
-            display_names = []
-            default_model_display_name = None
+        if not models_list:
+            messagebox.showwarning("Warning", "No models found for the selected backend.")
+            return
 
-            for model_obj in models_list:
-                model_name = model_obj.get('model')
-                if not model_name: continue
+        display_names = []
+        default_model_display_name = None
 
-                model_size = model_obj.get('size', 0)
-                description = model_descriptions.get(model_name, "")
+        for model_obj in models_list:
+            model_name = model_obj.get('model')
+            if not model_name: continue
 
-                display_name = f"{model_name} ({self._bytes_to_gb(model_size)}){description}"
+            model_size = model_obj.get('size', 0)
+            description = model_descriptions.get(model_name, "")
 
-                self.model_map[display_name] = model_name
-                display_names.append(display_name)
+            display_name = f"{model_name} ({self._bytes_to_gb(model_size)}){description}"
 
-                # Check if the current model is the desired default
-                if model_name == "llama3.1:8b":
-                    default_model_display_name = display_name
+            self.model_map[display_name] = model_name
+            display_names.append(display_name)
 
-            # Sort the display names alphabetically
-            display_names.sort()
-            self.ollama_model_dropdown['values'] = display_names
+            # Check if the current model is the desired default
+            if model_name == "llama3.1:8b":
+                default_model_display_name = display_name
 
-            # Set the default value
-            if default_model_display_name:
-                self.ollama_model_var.set(default_model_display_name)
-            elif display_names:
-                # Fallback to the first model if the preferred default isn't found
-                self.ollama_model_var.set(display_names[0])
+        # Sort the display names alphabetically
+        display_names.sort()
+        self.ollama_model_dropdown['values'] = display_names
 
-        except Exception as e:
-            messagebox.showerror("Error", f"Failed to connect to Ollama: {e}")
+        # Set the default value
+        if default_model_display_name:
+            self.ollama_model_var.set(default_model_display_name)
+        elif display_names:
+            # Fallback to the first model if the preferred default isn't found
+            self.ollama_model_var.set(display_names[0])
 
     def start_processing(self):
+        self.processing = True
         self.process_button.config(state=tk.DISABLED)
+        # The run keeps using the current backend, so it can't be replaced until the run ends.
+        self.connect_button.config(state=tk.DISABLED)
         self.cancel_button.config(state=tk.NORMAL)
         self.cancel_event.clear()
         self.log_text.delete(1.0, tk.END)
@@ -322,85 +559,87 @@ class BugReportGUI(tk.Tk):
         self.progress_status_label.config(text=status_text)
 
     def process_data(self):
-        try:
-            selected_projects = [p for p, v in self.project_vars.items() if v.get()]
-            if not selected_projects:
-                print("No projects selected. Aborting.")
-                return
+        from pipeline import generate_report
 
-            print("Starting report generation...")
-            self.after(0, self.update_progress, 0, "0%", "Loading data...")
-            all_df = load_and_preprocess(self.csv_path, [self.component_col_var.get()], self.project_col_var.get())
-            all_df = all_df[all_df[self.project_col_var.get()].isin(selected_projects)]
-            print(f"Processing {len(all_df)} reports for {len(selected_projects)} selected project(s).")
-
-            project_col = self.project_col_var.get()
-            projects_list = all_df[project_col].unique()
-            num_projects = len(projects_list)
-            num_component_summaries = \
-            all_df.explode('All_Components_List')[['All_Components_List', project_col]].drop_duplicates().shape[0]
-            total_summary_tasks = num_projects + num_component_summaries
-
-            project_graphs = {}
-            for i, project_code in enumerate(projects_list):
-                if self.cancel_event.is_set(): return
-                status_text = f"Graphing: {project_code[:35]}..."
-                progress_val = ((i + 1) / num_projects) * 10
-                self.after(0, self.update_progress, progress_val, f"{int(progress_val)}%", status_text)
-                project_df = all_df[all_df[project_col] == project_code]
-                project_graphs[project_code] = {
-                    'reports_per_component': generate_reports_per_component_bar(project_df),
-                    'resolution_pie': generate_resolution_pie(project_df),
-                    'priority_chart': generate_grouped_bar_chart(project_df, 'Priority'),
-                    'severity_chart': generate_grouped_bar_chart(project_df, 'Severity'),
-                    'reports_over_time': generate_reports_over_time_line(project_df),
-                }
-
-            if self.cancel_event.is_set(): return
-
-            self.after(0, self.update_progress, 10, "10%", "Preparing AI summaries...")
-
-            try:
-                chunk_size_str = self.chunk_size_var.get()
-                if chunk_size_str == 'Process All at Once':
-                    chunk_size = len(all_df) + 1
-                    print(f"Processing all {len(all_df)} reports in a single prompt.")
-                else:
-                    chunk_size = int(chunk_size_str)
-                    print(f"Using a chunk size of {chunk_size} reports.")
-            except (ValueError, TypeError):
-                chunk_size = 5
-                print(f"Invalid chunk size '{self.chunk_size_var.get()}'. Defaulting to {chunk_size}.")
-
-            output_dir = './project_component_csvs'
-            if not os.path.exists(output_dir): os.makedirs(output_dir)
-
-            project_component_dfs = split_by_project_and_component(all_df, project_col, output_dir)
-            actual_model_name = self.model_map.get(self.ollama_model_var.get(), 'llama3:8b')
-
-            project_overall_summaries, project_component_summaries = generate_summary_table(
-                all_df, project_component_dfs, project_col, actual_model_name, chunk_size, self.cancel_event, self,
-                total_summary_tasks
-            )
-
-            if self.cancel_event.is_set(): return
-
-            self.after(0, self.update_progress, 100, "100%", "Building HTML report...")
-            html_report = build_html_report(project_overall_summaries, project_component_summaries, project_graphs,
-                                            output_dir)
-
-            with open(self.output_path, 'w', encoding='utf-8') as f:
-                f.write(html_report)
-            print(f"\nReport saved to {os.path.abspath(self.output_path)}")
-
-            self.after(100, self.processing_finished, self.output_path)
+        service_url = self.service_url_var.get().strip()
+        try:
+            if service_url:
+                output_file = self.run_on_service(service_url)
+            else:
+                output_file = generate_report(
+                    self.csv_path, self.project_col_var.get(), self.component_col_var.get(), self.selected_projects,
+                    self.model_map.get(self.ollama_model_var.get(), 'llama3:8b'), self.output_path, self.backend,
+                    engine=self.engine_var.get(), chunk_size=self.chunk_size_var.get(),
+                    keep_alive=self.keep_alive_var.get(), batch_threshold=self._batch_threshold(),
+                    structured_output=self.structured_output_var.get(),
+                    overall_from_components=self.overall_from_components_var.get(),
+                    early_exit=self.early_exit_var.get(),
+                    transcript_path=os.path.splitext(self.output_path)[0] + '.transcripts.log'
+                    if self.transcript_to_file_var.get() else None,
+                    cancel_event=self.cancel_event,
+                    progress_callback=lambda *args: self.after(0, self.update_progress, *args),
+                )
+            if output_file:
+                self.after(100, self.processing_finished, output_file)
 
         except Exception as e:
             print(f"\n--- ERROR DURING PROCESSING ---\n{e}")
             self.after(0, self.update_progress, 0, "Error", "An error occurred.")
         finally:
-            self.process_button.config(state=tk.NORMAL)
-            self.cancel_button.config(state=tk.DISABLED)
+            # This runs on the worker thread, so hand the widget updates to the Tk loop.
+            self.after(0, self.processing_stopped)
+
+    def processing_stopped(self):
+        self.processing = False
+        for backend in self.retired_backends:
+            backend.close()
+        self.retired_backends = []
+        self.process_button.config(state=tk.NORMAL)
+        self.cancel_button.config(state=tk.DISABLED)
+        self.connect_button.config(state=tk.NORMAL)
+
+    def _batch_threshold(self):
+        batch_threshold_str = self.batch_threshold_var.get().strip()
+        return int(batch_threshold_str) if batch_threshold_str.isdigit() else 0
+
+    def run_on_service(self, service_url):
+        """
+        Submits the report to a running report service instead of generating it here, follows its
+        progress and downloads the finished report to the output path. Returns the output path, or
+        None if the job was cancelled.
+        """
+        from report_service import ReportServiceClient
+
+        client = ReportServiceClient(service_url)
+        job = client.submit({
+            'csv_path': os.path.abspath(self.csv_path),
+            'project_col': self.project_col_var.get(),
+            'component_col': self.component_col_var.get(),
+            'projects': sorted(self.selected_projects),
+            'model': self.model_map.get(self.ollama_model_var.get(), 'llama3:8b'),
+            'engine': self.engine_var.get(),
+            'chunk_size': self.chunk_size_var.get(),
+            'keep_alive': self.keep_alive_var.get(),
+            'batch_threshold': self._batch_threshold(),
+            'structured_output': self.structured_output_var.get(),
+            'overall_from_components': self.overall_from_components_var.get(),
+            'early_exit': self.early_exit_var.get(),
+        })
+        if job['deduplicated']:
+            print(f"The report service already has this report as job {job['id']}; following it.")
+        else:
+            print(f"Submitted job {job['id']} to the report service at {service_url}.")
+
+        job = client.wait(job['id'], cancel_event=self.cancel_event,
+                          progress_callback=lambda *args: self.after(0, self.update_progress, *args))
+        if job['status'] == 'failed':
+            raise RuntimeError(f"The report service failed job {job['id']}: {job['error']}")
+        if job['status'] != 'done':
+            return None
+        with open(self.output_path, 'w', encoding='utf-8') as f:
+            f.write(client.report(job['id']))
+        print(f"\nReport saved to {os.path.abspath(self.output_path)}")
+        return self.output_path
 
     def processing_finished(self, output_file):
         if not self.cancel_event.is_set() and output_file:
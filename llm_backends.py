@@ -0,0 +1,254 @@
+import hashlib
+import json
+import os
+import threading
+
+# --- CONFIGURATION ---
+DEFAULT_OLLAMA_HOST = 'http://10.65.168.147:11434'
+DEFAULT_OPENAI_BASE_URL = 'http://localhost:8080/v1'
+DEFAULT_TIMEOUT = 600.0  # Seconds to wait for a full (non-streamed) completion.
+DEFAULT_CONNECT_TIMEOUT = 5.0  # Fail fast when the server is unreachable.
+DEFAULT_MAX_CONNECTIONS = 4
+
+BACKEND_TYPES = ['Ollama', 'OpenAI-compatible', 'Replay from disk', 'Ollama (record to disk)']
+
+
+def _http_settings(timeout, connect_timeout, max_connections):
+    """Builds the httpx timeout and pool limits shared by every backend's persistent client."""
+    import httpx
+    return (
+        httpx.Timeout(timeout, connect=connect_timeout),
+        httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections),
+    )
+
+
+class LLMBackend:
+    """
+    Interface for the chat model servers used to summarize reports.
+
+    chat() returns an Ollama-style dict: {'message': {'content': ...}} plus whichever of
+    prompt_eval_count, eval_count, prompt_eval_duration and eval_duration the server reports.
+    list_models() returns a list of {'model': name, 'size': bytes} dicts.
+    """
+
+    def chat(self, model, messages, **options):
+        raise NotImplementedError
+
+    def list_models(self):
+        raise NotImplementedError
+
+    def preload(self, model, keep_alive=None):
+        """Loads the model into memory ahead of the first chat call. A no-op where the server manages this."""
+        return None
+
+    def close(self):
+        pass
+
+
+class OllamaBackend(LLMBackend):
+    """Talks to an Ollama server through a single keep-alive connection pool."""
+
+    def __init__(self, host=None, timeout=DEFAULT_TIMEOUT, connect_timeout=DEFAULT_CONNECT_TIMEOUT,
+                 max_connections=DEFAULT_MAX_CONNECTIONS):
+        import ollama
+        self.host = host or os.environ.get('OLLAMA_HOST', DEFAULT_OLLAMA_HOST)
+        http_timeout, limits = _http_settings(timeout, connect_timeout, max_connections)
+        # Extra keyword arguments are passed through to the underlying httpx.Client.
+        self.client = ollama.Client(host=self.host, timeout=http_timeout, limits=limits)
+
+    @staticmethod
+    def _as_dict(response):
+        # Newer ollama clients return pydantic models; older ones return plain dicts.
+        if hasattr(response, 'model_dump'):
+            return response.model_dump()
+        return dict(response)
+
+    def chat(self, model, messages, **options):
+        return self._as_dict(self.client.chat(model=model, messages=messages, **options))
+
+    def preload(self, model, keep_alive=None):
+        # An empty prompt makes Ollama load the model without generating anything.
+        options = {} if keep_alive is None else {'keep_alive': keep_alive}
+        return self._as_dict(self.client.generate(model=model, prompt='', **options))
+
+    def list_models(self):
+        response = self._as_dict(self.client.list())
+        models = []
+        for model_obj in response.get('models', []):
+            model_obj = self._as_dict(model_obj)
+            name = model_obj.get('model') or model_obj.get('name')
+            if name:
+                models.append({'model': name, 'size': model_obj.get('size', 0)})
+        return models
+
+    def close(self):
+        inner = getattr(self.client, '_client', None)
+        if inner is not None:
+            inner.close()
+
+
+class OpenAICompatibleBackend(LLMBackend):
+    """
+    Talks to any server implementing the OpenAI chat completions API, such as the llama.cpp
+    server or a local gateway, through a single keep-alive connection pool.
+    """
+
+    def __init__(self, base_url=None, api_key=None, timeout=DEFAULT_TIMEOUT,
+                 connect_timeout=DEFAULT_CONNECT_TIMEOUT, max_connections=DEFAULT_MAX_CONNECTIONS):
+        import httpx
+        self.base_url = (base_url or os.environ.get('OPENAI_BASE_URL', DEFAULT_OPENAI_BASE_URL)).rstrip('/')
+        api_key = api_key or os.environ.get('OPENAI_API_KEY')
+        headers = {'Authorization': f'Bearer {api_key}'} if api_key else {}
+        http_timeout, limits = _http_settings(timeout, connect_timeout, max_connections)
+        self.client = httpx.Client(base_url=self.base_url, headers=headers, timeout=http_timeout, limits=limits)
+
+    def chat(self, model, messages, **options):
+        payload = {'model': model, 'messages': messages, 'stream': False}
+        # Ollama's `format` is either 'json' or a JSON schema; translate it to response_format.
+        response_format = options.pop('format', None)
+        if isinstance(response_format, dict):
+            payload['response_format'] = {'type': 'json_schema',
+                                          'json_schema': {'name': 'summary', 'schema': response_format}}
+        elif response_format == 'json':
+            payload['response_format'] = {'type': 'json_object'}
+        # Map the Ollama-style sampling options onto their OpenAI equivalents.
+        for key, value in (options.pop('options', None) or {}).items():
+            payload['max_tokens' if key == 'num_predict' else key] = value
+        # The model lifetime is managed by the server itself here.
+        options.pop('keep_alive', None)
+        payload.update(options)
+
+        response = self.client.post('/chat/completions', json=payload)
+        response.raise_for_status()
+        data = response.json()
+
+        usage = data.get('usage') or {}
+        result = {
+            'message': {'role': 'assistant', 'content': data['choices'][0]['message'].get('content') or ''},
+            'prompt_eval_count': usage.get('prompt_tokens', 0),
+            'eval_count': usage.get('completion_tokens', 0),
+        }
+        # llama.cpp's server also reports its own timings in milliseconds.
+        timings = data.get('timings') or {}
+        if timings:
+            result['prompt_eval_duration'] = int(timings.get('prompt_ms', 0) * 1e6)
+            result['eval_duration'] = int(timings.get('predicted_ms', 0) * 1e6)
+        return result
+
+    def list_models(self):
+        response = self.client.get('/models')
+        response.raise_for_status()
+        return [{'model': m['id'], 'size': 0} for m in response.json().get('data', []) if m.get('id')]
+
+    def close(self):
+        self.client.close()
+
+
+class RecordReplayBackend(LLMBackend):
+    """
+    Serves chat responses from JSON files on disk, keyed by a hash of the model, messages and
+    options. When wrapping another backend, responses that are not on disk yet are fetched
+    from it and recorded, so later runs can replay them offline.
+    """
+
+    MODELS_FILE = 'models.json'
+
+    def __init__(self, directory, backend=None):
+        self.directory = directory
+        self.backend = backend
+        os.makedirs(directory, exist_ok=True)
+
+    def _recording_path(self, model, messages, options):
+        # keep_alive doesn't change the response, so recordings are shared across keep_alive settings.
+        options = {key: value for key, value in options.items() if key != 'keep_alive'}
+        key = json.dumps({'model': model, 'messages': messages, 'options': options}, sort_keys=True, default=str)
+        return os.path.join(self.directory, hashlib.sha256(key.encode('utf-8')).hexdigest() + '.json')
+
+    def chat(self, model, messages, **options):
+        path = self._recording_path(model, messages, options)
+        if os.path.exists(path):
+            with open(path, encoding='utf-8') as f:
+                return json.load(f)
+        if self.backend is None:
+            raise LookupError(f"No recorded response for this prompt in '{self.directory}'.")
+
+        response = self.backend.chat(model, messages, **options)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(response, f, default=str)
+        return response
+
+    def preload(self, model, keep_alive=None):
+        if self.backend is not None:
+            return self.backend.preload(model, keep_alive)
+        return None
+
+    def list_models(self):
+        path = os.path.join(self.directory, self.MODELS_FILE)
+        if self.backend is not None:
+            models = self.backend.list_models()
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump(models, f)
+            return models
+        if os.path.exists(path):
+            with open(path, encoding='utf-8') as f:
+                return json.load(f)
+        return []
+
+    def close(self):
+        if self.backend is not None:
+            self.backend.close()
+
+
+class ConcurrencyLimitedBackend(LLMBackend):
+    """
+    Wraps another backend so that at most max_requests chat and preload calls run at once, however
+    many threads or report jobs share it. The rest wait their turn on the client side.
+    """
+
+    def __init__(self, backend, max_requests=1):
+        self.backend = backend
+        self.max_requests = max_requests
+        self._slots = threading.BoundedSemaphore(max_requests)
+
+    def chat(self, model, messages, **options):
+        with self._slots:
+            return self.backend.chat(model, messages, **options)
+
+    def preload(self, model, keep_alive=None):
+        with self._slots:
+            return self.backend.preload(model, keep_alive)
+
+    def list_models(self):
+        return self.backend.list_models()
+
+    def close(self):
+        self.backend.close()
+
+
+def create_backend(backend_type, location=None, **kwargs):
+    """
+    Builds a backend from one of BACKEND_TYPES. `location` is the server URL, or the
+    recordings directory for the replay backends.
+    """
+    if backend_type == 'Ollama':
+        return OllamaBackend(host=location, **kwargs)
+    if backend_type == 'OpenAI-compatible':
+        return OpenAICompatibleBackend(base_url=location, **kwargs)
+    if backend_type == 'Replay from disk':
+        return RecordReplayBackend(location or 'llm_recordings')
+    if backend_type == 'Ollama (record to disk)':
+        return RecordReplayBackend(location or 'llm_recordings', backend=OllamaBackend(**kwargs))
+    raise ValueError(f"Unknown LLM backend '{backend_type}'.")
+
+
+_default_backend = None
+_default_backend_lock = threading.Lock()
+
+
+def get_default_backend():
+    """Returns a shared OllamaBackend for callers that don't pass a backend explicitly."""
+    global _default_backend
+    with _default_backend_lock:
+        if _default_backend is None:
+            _default_backend = OllamaBackend()
+        return _default_backend
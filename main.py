@@ -1,10 +1,35 @@
+import time
+
+# Taken before anything else is imported so the measurement includes all import time.
+_PROCESS_START = time.perf_counter()
+
+import json
+import sys
+
 from gui import BugReportGUI
 
+
+def _report_time_to_first_window(app, exit_after):
+    """Prints how long it took from process start until the window was first drawn."""
+    app.update_idletasks()
+    elapsed = time.perf_counter() - _PROCESS_START
+    if exit_after:
+        # The GUI redirects sys.stdout into its log window, so write to the real stdout.
+        sys.__stdout__.write(json.dumps({'time_to_first_window_s': elapsed}) + "\n")
+        sys.__stdout__.flush()
+        app.destroy()
+    else:
+        print(f"Window ready in {elapsed:.2f} s.")
+
+
 if __name__ == "__main__":
     """
     Main entry point for the application.
 
     This script initializes and runs the main graphical user interface.
+    Pass --measure-startup to print the time-to-first-window as JSON and exit.
     """
+    measure_only = '--measure-startup' in sys.argv[1:]
     app = BugReportGUI()
-    app.mainloop()
\ No newline at end of file
+    app.after_idle(_report_time_to_first_window, app, measure_only)
+    app.mainloop()
@@ -1,11 +1,45 @@
-import os
-
-# Set the OLLAMA_HOST environment variable
-os.environ['OLLAMA_HOST'] = 'http://10.65.168.147:11434'
-
-import ollama
+import hashlib
+import json
+import logging
 import markdown
 import re
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from difflib import SequenceMatcher
+from logging.handlers import RotatingFileHandler
+from llm_backends import get_default_backend
+
+
+# Full LLM responses go here when a transcript file is configured, instead of to the console.
+transcript_logger = logging.getLogger('bug_report_summarizer.transcripts')
+transcript_logger.setLevel(logging.INFO)
+transcript_logger.propagate = False
+
+
+def configure_transcript_log(path, max_bytes=5 * 1024 * 1024, backup_count=3):
+    """
+    Sends full LLM responses to a rotating log file at `path`.
+    Passing None goes back to printing them to the console.
+    """
+    for handler in list(transcript_logger.handlers):
+        transcript_logger.removeHandler(handler)
+        handler.close()
+    if path:
+        handler = RotatingFileHandler(path, maxBytes=max_bytes, backupCount=backup_count, encoding='utf-8')
+        handler.setFormatter(logging.Formatter('%(asctime)s %(message)s'))
+        transcript_logger.addHandler(handler)
+    return path
+
+
+def _log_llm_response(progress_label, response_md):
+    """Writes an LLM response to the transcript file if one is configured, otherwise to the console."""
+    if transcript_logger.handlers:
+        transcript_logger.info("--- LLM Response: %s ---\n%s\n--- End of Response ---", progress_label, response_md)
+        return
+    print("\n" + "--- LLM Response ---".center(60, "-"))
+    print(response_md)
+    print("--- End of Response ---".center(60, "-") + "\n")
 
 
 def parse_llm_output(raw_text):
@@ -62,18 +96,412 @@ def parse_llm_output(raw_text):
     return sections
 
 
-def _generate_iterative_summary(df, initial_prompt, refinement_prompt, ollama_model, chunk_size, progress_label):
+# --- Prompts ---
+# The fixed instructions come first and the project/component names and reports last, so every
+# request of a run starts with the same system message and instruction block. That shared prefix
+# lets the server reuse its prompt cache instead of re-evaluating the instructions each time.
+MARKDOWN_SYSTEM_PROMPT = "You are a software QA expert. Always respond using the exact markdown format requested."
+
+# Each block is the task, then (for markdown output) the response format. Structured output leaves
+# the format out: the JSON system prompt and schema define it, and the two must not contradict.
+OVERALL_TASK = ("Write a concise overall summary of key recurring issues and their impact across all components of a project, based on its bug reports.\n"
+                "List main issue areas and recurring trends as bullet points, and provide a short customer impact summary. There should only be 5 bullets at most for the summary.")
+
+OVERALL_MARKDOWN_FORMAT = """ Use markdown formatting.
+Please follow this format exactly. Example:
+## Summary
+- Example bullet 1 (grouped issue)
+- Example bullet 2
+
+## Potential Customer Impact
+Two sentences.
+
+"""
+
+OVERALL_INSTRUCTIONS = OVERALL_TASK + OVERALL_MARKDOWN_FORMAT
+
+COMPONENT_TASKS = (
+    "1. Summarize the key findings and recurring issues as a bullet list, with a maximum of 5 concise bullet points.\n"
+    "2. Provide separate bulleted recommendations for developers.\n"
+    "3. Provide separate bulleted recommendations for testers.\n"
+    "4. Add a one or two sentence potential customer impact description.\n"
+    "5. Rate the customer impact as HIGH, MEDIUM, or LOW, depending on how much a customer can be affected. Only answer either of the three.\n"
+)
+
+COMPONENT_SECTIONS = (
+    "## Summary\n(bulleted list)\n\n"
+    "## Recommendations for Developers\n(bulleted list)\n\n"
+    "## Recommendations for Testers\n(bulleted list)\n\n"
+    "## Potential Customer Impact\n(one or two sentences)\n\n"
+    "## Impact Level\n(Write: Impact: HIGH/MEDIUM/LOW)\n\n"
+)
+
+COMPONENT_TASK = "You will be given bug reports for one component of a project.\n" + COMPONENT_TASKS
+COMPONENT_MARKDOWN_FORMAT = (
+    "Respond in Markdown format, use clear section markers, do not ever respond in any other way:\n"
+    + COMPONENT_SECTIONS
+)
+COMPONENT_INSTRUCTIONS = COMPONENT_TASK + COMPONENT_MARKDOWN_FORMAT
+
+# Several small components are summarized in one request; each gets its own delimited block.
+BATCH_BLOCK_START = "=== COMPONENT: {component} ==="
+BATCH_BLOCK_END = "=== END COMPONENT ==="
+BATCH_COMPONENT_TASK = (
+    "You will be given bug reports for several components of a project. Summarize each component separately, "
+    "using only that component's own reports. For each component:\n"
+    + COMPONENT_TASKS
+)
+BATCH_MARKDOWN_FORMAT = (
+    "Respond in Markdown format with one block per component. Start each block with the line "
+    f"'{BATCH_BLOCK_START.format(component='<component name>')}' and end it with the line '{BATCH_BLOCK_END}'. "
+    "Inside each block, use these section markers and do not ever respond in any other way:\n"
+    + COMPONENT_SECTIONS
+)
+BATCH_COMPONENT_INSTRUCTIONS = BATCH_COMPONENT_TASK + BATCH_MARKDOWN_FORMAT
+
+HIERARCHICAL_OVERALL_TASK = ("Write a concise overall summary of key recurring issues and their impact across all components of a project, based on the per-component summaries and impact levels below.\n"
+                             "Group related issues across components, favour components rated HIGH, and list main issue areas and recurring trends as bullet points. There should only be 5 bullets at most for the summary. Provide a short customer impact summary.")
+HIERARCHICAL_OVERALL_INSTRUCTIONS = HIERARCHICAL_OVERALL_TASK + OVERALL_MARKDOWN_FORMAT
+
+
+def _instructions(task, markdown_format, structured_output):
+    """The task followed by its markdown response format, or by a blank line alone for structured output."""
+    return task.rstrip('\n') + '\n\n' if structured_output else task + markdown_format
+
+
+REFINEMENT_INSTRUCTION = ("Combine the existing summary and the new batch of reports below into a single, new, "
+                          "comprehensive summary in the same format.\n\n")
+
+
+# --- Structured (JSON) output ---
+# Display headings for each section key, in the order they appear in the markdown format.
+SECTION_HEADINGS = {
+    'summary': 'Summary',
+    'rec_devs': 'Recommendations for Developers',
+    'rec_testers': 'Recommendations for Testers',
+    'customer_impact': 'Potential Customer Impact',
+    'impact_level': 'Impact Level',
+}
+LIST_FIELDS = ('summary', 'rec_devs', 'rec_testers')
+IMPACT_LEVELS = ('HIGH', 'MEDIUM', 'LOW')
+COMPONENT_FIELDS = ('summary', 'rec_devs', 'rec_testers', 'customer_impact', 'impact_level')
+OVERALL_FIELDS = ('summary', 'customer_impact')
+MAX_REASK_ATTEMPTS = 2
+
+STRUCTURED_SYSTEM_PROMPT = ("You are a software QA expert. Return the requested sections as a single JSON object "
+                            "instead of markdown, with exactly the fields: {fields}. Bulleted sections are JSON "
+                            "arrays of strings, one string per bullet.")
+BATCH_STRUCTURED_SYSTEM_PROMPT = ("You are a software QA expert. Return a single JSON object instead of markdown, "
+                                  "with one key per component name. Each value is an object with exactly the "
+                                  "fields: {fields}. Bulleted sections are JSON arrays of strings, one string "
+                                  "per bullet.")
+
+# --- Batching of small components ---
+MAX_COMPONENTS_PER_BATCH = 8  # Keeps batched prompts and responses to a manageable length.
+AUTOTUNE_POLL_S = 0.5  # How often a run with an autotuner checks whether it may send more requests at once.
+_BATCH_START_PATTERN = re.compile(r'^\s*=+\s*COMPONENT\s*:\s*(.+?)\s*=+\s*$', re.IGNORECASE)
+_BATCH_END_PATTERN = re.compile(r'^\s*=+\s*END\s+COMPONENT\s*=+\s*$', re.IGNORECASE)
+
+# --- Early exit once a summary has settled ---
+CONVERGENCE_SIMILARITY = 0.9  # A refinement at least this similar to the previous summary changed nothing much.
+CONVERGENCE_STABLE_CHUNKS = 2  # Consecutive unchanged refinements before the remaining chunks are only screened.
+NOTABLE_SEVERITIES = ('Blocker', 'Critical', 'High')  # Priority/Severity values that always reach the model.
+NOVEL_WORD_SHARE = 0.5  # A report is novel if at least this share of its title's words is not in the summary.
+REPORT_TITLE_COLUMN = 'Summary'
+_WORD_PATTERN = re.compile(r'[a-z0-9]+')
+
+
+def build_summary_schema(fields):
+    """Builds the JSON schema passed as Ollama's `format` for the given section keys."""
+    properties = {}
+    for field in fields:
+        if field in LIST_FIELDS:
+            properties[field] = {'type': 'array', 'items': {'type': 'string'}, 'minItems': 1}
+        elif field == 'impact_level':
+            properties[field] = {'type': 'string', 'enum': list(IMPACT_LEVELS)}
+        else:
+            properties[field] = {'type': 'string'}
+    return {'type': 'object', 'properties': properties, 'required': list(fields)}
+
+
+def parse_structured_output(raw_text, fields):
+    """
+    Validates a JSON response against the expected fields.
+    Returns (sections, invalid_fields), where sections holds the valid fields as markdown text
+    in the same shape parse_llm_output produces.
+    """
+    sections = {}
+    try:
+        data = json.loads(raw_text)
+    except (TypeError, ValueError):
+        return sections, list(fields)
+    if not isinstance(data, dict):
+        return sections, list(fields)
+
+    invalid_fields = []
+    for field in fields:
+        value = data.get(field)
+        if field in LIST_FIELDS:
+            if isinstance(value, str):
+                value = [value]
+            items = [str(item).strip() for item in value or [] if str(item).strip()] if isinstance(value, list) else []
+            if items:
+                sections[field] = '\n'.join(f'- {item.lstrip("-* ").strip()}' for item in items)
+            else:
+                invalid_fields.append(field)
+        elif field == 'impact_level':
+            impact_match = re.search(r'\b(HIGH|MEDIUM|LOW)\b', str(value or ''), re.IGNORECASE)
+            if impact_match:
+                sections[field] = impact_match.group(1).upper()
+            else:
+                invalid_fields.append(field)
+        else:
+            if isinstance(value, str) and value.strip():
+                sections[field] = value.strip()
+            else:
+                invalid_fields.append(field)
+    return sections, invalid_fields
+
+
+def sections_to_markdown(sections, fields):
+    """Renders parsed sections in the markdown format parse_llm_output expects."""
+    return '\n\n'.join(f"## {SECTION_HEADINGS[field]}\n{sections.get(field, '')}" for field in fields)
+
+
+def split_batched_output(raw_text, components):
+    """
+    Splits a multi-component response into {component: markdown block} using the
+    BATCH_BLOCK_START/BATCH_BLOCK_END delimiter lines. Each block is in the format
+    parse_llm_output expects. Components without a block are left out.
+    """
+    wanted = {str(comp).strip().lower(): comp for comp in components}
+    blocks = {}
+    current = None
+    buffer = []
+
+    def save():
+        if current is not None and current not in blocks:
+            blocks[current] = '\n'.join(buffer).strip()
+
+    for line in raw_text.splitlines():
+        start = _BATCH_START_PATTERN.match(line)
+        if start or _BATCH_END_PATTERN.match(line):
+            save()
+            # Models sometimes quote or bold the name; match it loosely against the requested components.
+            current = wanted.get(start.group(1).strip(" '\"`*").lower()) if start else None
+            buffer = []
+        elif current is not None:
+            buffer.append(line)
+    save()
+    return blocks
+
+
+def _report_chars(reports_csv):
+    """Length of the report rows in a CSV chunk, without the header line that every chunk repeats."""
+    return len(reports_csv) - reports_csv.find('\n') - 1
+
+
+def _chat(backend, ollama_model, messages, telemetry=None, project=None, component=None, label=None, autotuner=None,
+          chunk=None, components=None, **options):
+    """
+    Sends one chat request and records its timing and token counts.
+    chunk is the (report count, report characters) of the reports in the prompt; the autotuner
+    learns from calls that carry one. components ({component: share}) attributes a call made
+    for several components (see RunTelemetry.record_llm_call).
+    """
+    tuned = autotuner is not None and chunk is not None
+    in_flight = autotuner.call_started() if tuned else 0
+    call_start = time.perf_counter()
+    response = None
+    try:
+        response = backend.chat(ollama_model, messages, **options)
+    finally:
+        elapsed = time.perf_counter() - call_start
+        if tuned:
+            autotuner.record_call(response, elapsed, chunk[0], chunk[1],
+                                  sum(len(message['content']) for message in messages), in_flight)
+    if telemetry is not None:
+        telemetry.record_llm_call(response, elapsed, project=project, component=component, label=label,
+                                  components=components)
+    return response
+
+
+def warm_up_model(ollama_model, backend=None, keep_alive=None, telemetry=None):
+    """
+    Loads the model on the server before the first summary is requested, so the load time
+    overlaps with preprocessing and charting instead of delaying the first chat call.
+    """
+    backend = backend or get_default_backend()
+    start = time.perf_counter()
+    try:
+        backend.preload(ollama_model, keep_alive=keep_alive)
+    except Exception as e:
+        print(f"Model warm-up failed ({e}); the model will load on the first request instead.")
+        return
+    elapsed = time.perf_counter() - start
+    if telemetry is not None:
+        telemetry.record_stage('model_warm_up', elapsed)
+    print(f"Model '{ollama_model}' warmed up in {elapsed:.1f} s.")
+
+
+def _reask_invalid_fields(backend, ollama_model, messages, raw_response, sections, invalid_fields, progress_label,
+                          **chat_kwargs):
+    """
+    Asks the model again for only the missing or invalid fields, continuing the same conversation,
+    and merges the valid answers into `sections`. Returns the fields that are still invalid.
+    """
+    for attempt in range(MAX_REASK_ATTEMPTS):
+        if not invalid_fields:
+            break
+        print(f"  -> Re-asking for {progress_label}: missing or invalid {', '.join(invalid_fields)}")
+        follow_up = messages + [
+            {"role": "assistant", "content": raw_response},
+            {"role": "user", "content": (f"The fields {', '.join(invalid_fields)} were missing or invalid. "
+                                         "Respond with a JSON object containing only those fields.")},
+        ]
+        response = _chat(backend, ollama_model, follow_up, label=f"{progress_label} (re-ask)",
+                         format=build_summary_schema(invalid_fields), **chat_kwargs)
+        raw_response = response['message']['content']
+        new_sections, invalid_fields = parse_structured_output(raw_response, invalid_fields)
+        sections.update(new_sections)
+    return invalid_fields
+
+
+def _request_summary(backend, ollama_model, prompt, progress_label, structured_fields, chat_kwargs, chunk=None):
+    """Sends a single summary prompt and returns the response as markdown."""
+    if structured_fields:
+        messages = [
+            {"role": "system", "content": STRUCTURED_SYSTEM_PROMPT.format(fields=', '.join(structured_fields))},
+            {"role": "user", "content": prompt}
+        ]
+        response = _chat(backend, ollama_model, messages, label=progress_label, chunk=chunk,
+                         format=build_summary_schema(structured_fields), **chat_kwargs)
+        raw_response = response['message']['content']
+        _log_llm_response(progress_label, raw_response)
+
+        sections, invalid_fields = parse_structured_output(raw_response, structured_fields)
+        invalid_fields = _reask_invalid_fields(backend, ollama_model, messages, raw_response, sections,
+                                               invalid_fields, progress_label, **chat_kwargs)
+        if invalid_fields:
+            print(f"  -> Warning: {progress_label} is still missing {', '.join(invalid_fields)}")
+        return sections_to_markdown(sections, structured_fields)
+
+    messages = [
+        {"role": "system", "content": MARKDOWN_SYSTEM_PROMPT},
+        {"role": "user", "content": prompt}
+    ]
+    response = _chat(backend, ollama_model, messages, label=progress_label, chunk=chunk, **chat_kwargs)
+    summary_md = response['message']['content']
+
+    # --- Display the LLM response in the terminal (or the transcript file) ---
+    _log_llm_response(progress_label, summary_md)
+    return summary_md
+
+
+def _words(text):
+    return _WORD_PATTERN.findall(str(text).lower())
+
+
+def summary_similarity(old_md, new_md):
+    """
+    How much a refinement changed a summary, from 0 (rewritten) to 1 (unchanged): the word-level
+    similarity of each parsed section, averaged over the sections either version has.
+    """
+    old_sections, new_sections = parse_llm_output(old_md), parse_llm_output(new_md)
+    ratios = [SequenceMatcher(None, _words(old_sections[key]), _words(new_sections[key]), autojunk=False).ratio()
+              for key in old_sections if old_sections[key] or new_sections[key]]
+    return sum(ratios) / len(ratios) if ratios else 1.0
+
+
+def _notable_reports(chunk_df, known_words):
+    """
+    The reports of a chunk still worth sending once the summary has settled: those with a
+    NOTABLE_SEVERITIES priority or severity, and those whose title is mostly words outside
+    known_words (the summary and the titles already summarized). Without any of those columns
+    every report is kept.
+    """
+    masks = [chunk_df[col].isin(NOTABLE_SEVERITIES) for col in ('Priority', 'Severity') if col in chunk_df.columns]
+    if REPORT_TITLE_COLUMN in chunk_df.columns:
+        def is_novel(title):
+            words = set(_words(title))
+            return bool(words) and len(words - known_words) / len(words) >= NOVEL_WORD_SHARE
+
+        masks.append(chunk_df[REPORT_TITLE_COLUMN].map(is_novel).astype(bool))
+    if not masks:
+        return chunk_df
+    notable = masks[0]
+    for mask in masks[1:]:
+        notable = notable | mask
+    return chunk_df[notable]
+
+
+def _generate_iterative_summary(df, initial_prompt, refinement_prompt, ollama_model, chunk_size, progress_label,
+                                telemetry=None, project=None, component=None, backend=None, structured_fields=None,
+                                keep_alive=None, rows=None, autotuner=None, early_exit=False):
     """
     Generates a summary by processing a DataFrame in chunks, showing progress and LLM output.
+    If `rows` (row labels of df) is given, only those rows are summarized; each chunk is selected
+    from df as it is sent, so the subset is never copied as a whole.
+    If a RunTelemetry is given, the wall time and token counts of every chat call are recorded.
+    Chat calls go to `backend`, or to the shared Ollama backend if none is given.
+
+    When structured_fields is given, each call asks for JSON matching those fields, invalid or
+    missing fields are re-asked for individually, and the result is returned as markdown.
+    keep_alive is passed to every request so the server keeps the model loaded between calls.
+    With an Autotuner, each chunk takes its current chunk_size instead of chunk_size.
+
+    With early_exit, each refinement is compared with the summary before it (summary_similarity).
+    Once CONVERGENCE_STABLE_CHUNKS refinements in a row changed nothing much, later chunks are only
+    screened for high-severity reports and those with mostly new title words (see _notable_reports).
+    Those reports are pooled across chunks and sent in one refinement once they fill a chunk (or the
+    reports run out), so most screened chunks cost no call at all. A refinement that does change
+    the summary brings back full chunks.
     """
+    backend = backend or get_default_backend()
+    chat_kwargs = {'telemetry': telemetry, 'project': project, 'component': component, 'autotuner': autotuner}
+    if keep_alive is not None:
+        chat_kwargs['keep_alive'] = keep_alive
     previous_summary_md = ""
-    total_reports = len(df)
-
-    for i in range(0, total_reports, chunk_size):
-        chunk_df = df.iloc[i:i + chunk_size]
+    total_reports = len(df) if rows is None else len(rows)
+    stable_chunks = 0
+    skipped_reports = 0
+    seen_title_words = set()  # Words of the report titles already sent, for the novelty check.
+    pooled_reports = []  # Notable reports of screened chunks, waiting to fill a chunk.
+    pooled_count = 0
+
+    i = 0
+    while i < total_reports:
+        size = autotuner.chunk_size if autotuner is not None else chunk_size
+        chunk_df = df.iloc[i:i + size] if rows is None else df.loc[rows[i:i + size]]
+        processed_count = min(i + size, total_reports)
+
+        if early_exit and stable_chunks >= CONVERGENCE_STABLE_CHUNKS:
+            chunk_reports = len(chunk_df)
+            chunk_df = _notable_reports(chunk_df, seen_title_words.union(_words(previous_summary_md)))
+            skipped_reports += chunk_reports - len(chunk_df)
+            if not chunk_df.empty:
+                pooled_reports.append(chunk_df)
+                pooled_count += len(chunk_df)
+            i += size
+            if pooled_count < size and i < total_reports:
+                print(f"  -> Summary for {progress_label} has settled; screened ({processed_count} of "
+                      f"{total_reports} reports), {pooled_count} high-severity or new report(s) pooled")
+                continue
+            if not pooled_reports:
+                print(f"  -> Summary for {progress_label} has settled; no high-severity or new reports left")
+                break
+            import pandas as pd
+            chunk_df = pd.concat(pooled_reports)
+            pooled_reports, pooled_count = [], 0
+            print(f"  -> Summary for {progress_label} has settled; refining with {len(chunk_df)} pooled "
+                  f"high-severity or new report(s)")
+        else:
+            i += size
         chunk_csv = chunk_df.to_csv(index=False)
+        if early_exit and REPORT_TITLE_COLUMN in chunk_df.columns:
+            for title in chunk_df[REPORT_TITLE_COLUMN]:
+                seen_title_words.update(_words(title))
 
-        processed_count = min(i + chunk_size, total_reports)
         print(f"  -> Processing chunk for {progress_label}: ({processed_count} of {total_reports} reports)")
 
         if not previous_summary_md:
@@ -84,123 +512,360 @@ def _generate_iterative_summary(df, initial_prompt, refinement_prompt, ollama_mo
                 new_reports=chunk_csv
             )
 
+        summary_md = _request_summary(backend, ollama_model, current_prompt, progress_label,
+                                      structured_fields, chat_kwargs, chunk=(len(chunk_df), _report_chars(chunk_csv)))
+        if early_exit and previous_summary_md:
+            if summary_similarity(previous_summary_md, summary_md) >= CONVERGENCE_SIMILARITY:
+                stable_chunks += 1
+            else:
+                stable_chunks = 0
+        previous_summary_md = summary_md
+
+    if skipped_reports:
+        print(f"  -> {progress_label}: {skipped_reports} of {total_reports} reports left out after the summary settled")
+    return previous_summary_md
+
+
+def _request_batched_component_summaries(df, project, batch, ollama_model, backend, structured_output, chat_kwargs):
+    """
+    Summarizes several small components of one project in a single request.
+    `batch` is a list of (component, row labels) pairs, each small enough to fit in one chunk.
+    Returns {component: markdown} for every component whose summary came back complete; the
+    caller summarizes the others individually.
+    """
+    components = [comp for comp, _ in batch]
+    reports_csvs = [df.loc[rows].to_csv(index=False) for _, rows in batch]
+    report_blocks = [
+        f"{BATCH_BLOCK_START.format(component=comp)}\nBug Reports:\n{reports_csv}{BATCH_BLOCK_END}"
+        for comp, reports_csv in zip(components, reports_csvs)
+    ]
+    chunk = (sum(len(rows) for _, rows in batch), sum(_report_chars(reports_csv) for reports_csv in reports_csvs))
+    # The run report splits the call's time and tokens between the components by report characters.
+    chat_kwargs = {**chat_kwargs, 'components': {
+        comp: _report_chars(reports_csv) / max(chunk[1], 1) for comp, reports_csv in zip(components, reports_csvs)
+    }}
+    prompt = (_instructions(BATCH_COMPONENT_TASK, BATCH_MARKDOWN_FORMAT, structured_output)
+              + f"Project: '{project}'\n\n" + '\n\n'.join(report_blocks))
+    progress_label = f"{len(batch)} components of project {project}"
+    print(f"  -> Summarizing {progress_label} in one request: {', '.join(str(comp) for comp in components)}")
+
+    if structured_output:
+        # The JSON object itself delimits the components: one schema-checked property per component.
+        schema = {
+            'type': 'object',
+            'properties': {str(comp): build_summary_schema(COMPONENT_FIELDS) for comp in components},
+            'required': [str(comp) for comp in components],
+        }
         messages = [
-            {"role": "system",
-             "content": "You are a software QA expert. Always respond using the exact markdown format requested."},
-            {"role": "user", "content": current_prompt}
+            {"role": "system", "content": BATCH_STRUCTURED_SYSTEM_PROMPT.format(fields=', '.join(COMPONENT_FIELDS))},
+            {"role": "user", "content": prompt}
         ]
-        response = ollama.chat(model=ollama_model, messages=messages)
-        previous_summary_md = response['message']['content']
+        response = _chat(backend, ollama_model, messages, label=progress_label, chunk=chunk, format=schema,
+                         **chat_kwargs)
+        raw_response = response['message']['content']
+        _log_llm_response(progress_label, raw_response)
+        try:
+            data = json.loads(raw_response)
+        except (TypeError, ValueError):
+            data = {}
+        if not isinstance(data, dict):
+            data = {}
+
+        summaries = {}
+        for comp in components:
+            sections, invalid_fields = parse_structured_output(json.dumps(data.get(str(comp))), COMPONENT_FIELDS)
+            if not invalid_fields:
+                summaries[comp] = sections_to_markdown(sections, COMPONENT_FIELDS)
+        return summaries
+
+    messages = [
+        {"role": "system", "content": MARKDOWN_SYSTEM_PROMPT},
+        {"role": "user", "content": prompt}
+    ]
+    response = _chat(backend, ollama_model, messages, label=progress_label, chunk=chunk, **chat_kwargs)
+    raw_response = response['message']['content']
+    _log_llm_response(progress_label, raw_response)
+
+    blocks = split_batched_output(raw_response, components)
+    # A block without a summary section is treated as missing.
+    return {comp: block for comp, block in blocks.items() if parse_llm_output(block)['summary']}
+
+
+def report_set_fingerprint(df, rows, ollama_model, prompt_template, chunk_size, structured_output=False):
+    """
+    Identifies a component summary by the reports it covers (the sorted Keys of `rows` in df), the
+    model and the fixed prompt template, so identical report sets in different projects are
+    summarized once. Returns None if the data has no Key column to identify reports by.
+    """
+    if 'Key' not in df.columns:
+        return None
+    payload = {
+        'keys': sorted(str(key) for key in df.loc[rows, 'Key']),
+        'model': ollama_model,
+        'prompt_template': prompt_template,
+        'chunk_size': chunk_size,
+        'structured_output': structured_output,
+    }
+    return hashlib.sha256(json.dumps(payload, sort_keys=True).encode('utf-8')).hexdigest()
 
-        # --- NEW: Display the LLM response in the terminal ---
-        print("\n" + "--- LLM Response ---".center(60, "-"))
-        print(previous_summary_md)
-        print("--- End of Response ---".center(60, "-") + "\n")
 
-    return previous_summary_md
+def _component_summaries_digest(component_fields):
+    """Formats the raw per-component sections as the input of a hierarchical overall summary."""
+    blocks = []
+    for comp, fields in component_fields.items():
+        blocks.append(
+            f"### Component: {comp} (Impact: {fields.get('impact_level') or 'N/A'})\n"
+            f"{fields.get('summary', '')}\n"
+            f"Customer impact: {fields.get('customer_impact', '')}"
+        )
+    return '\n\n'.join(blocks)
 
 
-def generate_summary_table(df, project_component_dfs, project_col, ollama_model, chunk_size):
+def generate_summary_table(df, project_component_rows, project_col, ollama_model, chunk_size, cancel_event=None,
+                           progress_callback=None, total_tasks=None, telemetry=None, backend=None,
+                           structured_output=False, keep_alive=None, overall_from_components=False,
+                           batch_threshold=0, autotuner=None, early_exit=False):
     """
     Generates summaries for each project and component with detailed progress reporting.
+    project_component_rows is the {project: {component: row labels}} mapping returned by
+    split_by_project_and_component.
+    progress_callback(value, percent_text, status_text) is called after every finished summary,
+    with value scaled to the 10-100 range the GUI reserves for summarization.
+    With structured_output, the model is asked for schema-validated JSON instead of markdown.
+    keep_alive (e.g. '30m') keeps the model loaded on an Ollama server for the length of the run.
+
+    Components whose report sets are identical (e.g. multi-project reports filed under the same
+    component in several projects) are summarized once; each copy lists the others in 'shared_with'.
+
+    With overall_from_components, each project's overall summary is written from its component
+    summaries and impact levels in a single short prompt, instead of a second pass over every report.
+
+    Components with at most batch_threshold reports (and no more than one chunk) are summarized
+    together, up to MAX_COMPONENTS_PER_BATCH per request. A component whose block is missing from
+    the batched response is summarized on its own. 0 disables batching.
+
+    With early_exit, chunked summaries stop sending every report once they have settled (see
+    _generate_iterative_summary).
+
+    Without an autotuner, summaries are requested one at a time, in order. With an
+    autotune.Autotuner, chunks follow its chunk_size and up to its concurrency summaries are
+    requested at once. Results are collected on the calling thread.
     """
     project_overall_summaries = {}
     project_component_summaries = {}
+    completed_tasks = 0
+    # Raw (markdown) component sections, needed for hierarchical overall summaries.
+    component_fields_raw = {}
+    # Row labels per project, computed once rather than filtering df again for every project.
+    project_rows = df.groupby(project_col, observed=True, sort=False).groups
+    initial_chunk_size = autotuner.chunk_size if autotuner is not None else chunk_size
+    batch_limit = min(batch_threshold, initial_chunk_size) if batch_threshold else 0
+
+    def cancelled():
+        return cancel_event is not None and cancel_event.is_set()
+
+    def report_progress(status_text):
+        nonlocal completed_tasks
+        completed_tasks += 1
+        if progress_callback and total_tasks:
+            progress_val = 10 + (completed_tasks / total_tasks) * 90
+            progress_callback(progress_val, f"{int(progress_val)}%", status_text[:40])
+
+    def chat_kwargs_for(project, comp=None):
+        chat_kwargs = {'telemetry': telemetry, 'project': project, 'component': comp, 'autotuner': autotuner}
+        if keep_alive is not None:
+            chat_kwargs['keep_alive'] = keep_alive
+        return chat_kwargs
+
+    # --- Summary requests; these run on worker threads and only return markdown ---
+    def summarize_overall(project):
+        print(f"\nProject {project} (Overall Summary): \n" + "=" * 40)
+        overall_label = f"Project {project} Overall"
 
-    for project, components in project_component_dfs.items():
-        project_data = df[df[project_col] == project]
+        if overall_from_components:
+            prompt = (_instructions(HIERARCHICAL_OVERALL_TASK, OVERALL_MARKDOWN_FORMAT, structured_output)
+                      + f"Project: '{project}'\n\n"
+                      "Component Summaries:\n" + _component_summaries_digest(component_fields_raw[project]))
+            print(f"  -> Building overall summary for {overall_label} from "
+                  f"{len(component_fields_raw[project])} component summaries")
+            return _request_summary(backend or get_default_backend(), ollama_model, prompt, overall_label,
+                                    OVERALL_FIELDS if structured_output else None, chat_kwargs_for(project))
 
         # --- Prompts for Overall Project Summary ---
-        overall_initial_prompt = (f"""
-            Analyze the following bug reports for project '{project}', and write a concise overall summary of key recurring issues and their impact across all components.
-            List main issue areas and recurring trends as bullet points, and provide a short customer impact summary. Use markdown formatting.
-            Please follow this format exactly. Example:
-            ## Summary
-            - Example bullet 1 (grouped issue)
-            - Example bullet 2
-
-            ## Potential Customer Impact
-            Two sentences.
-
-            Bug Reports:
-            {{reports_csv}}
-            """
-                                  )
-        overall_refinement_prompt = (f"""
-            Based on the existing summary and the new bug reports provided below, generate a single, updated, and a concise overall summary of key recurring issues and their impact across all components for project '{project}'.
-            List main issue areas and recurring trends as bullet points, and provide a short customer impact summary. There should only be 5 bullets at most for the summary. Use markdown formatting.
-            Please follow this format exactly. Example:
-            ## Summary
-            - Example bullet 1 (grouped issue)
-            - Example bullet 2
-
-            ## Potential Customer Impact
-            Two sentences.
-
-            ## Existing Summary:
-            {{previous_summary}}
-
-            ## New Bug Reports:
-            {{new_reports}}
-            """
-                                     )
-
-        print(f"\nProject {project} (Overall Summary): \n" + "=" * 40)
-        overall_label = f"Project {project} Overall"
+        overall_instructions = _instructions(OVERALL_TASK, OVERALL_MARKDOWN_FORMAT, structured_output)
+        overall_initial_prompt = overall_instructions + f"Project: '{project}'\n\nBug Reports:\n{{reports_csv}}"
+        overall_refinement_prompt = (
+            overall_instructions + REFINEMENT_INSTRUCTION + f"Project: '{project}'\n\n"
+            "## Existing Summary:\n{previous_summary}\n\n"
+            "## New Bug Reports:\n{new_reports}"
+        )
+        return _generate_iterative_summary(
+            df, overall_initial_prompt, overall_refinement_prompt, ollama_model, chunk_size,
+            overall_label, telemetry=telemetry, project=project, backend=backend,
+            structured_fields=OVERALL_FIELDS if structured_output else None, keep_alive=keep_alive,
+            rows=project_rows[project], autotuner=autotuner, early_exit=early_exit
+        )
 
-        overall_summary_md = _generate_iterative_summary(
-            project_data, overall_initial_prompt, overall_refinement_prompt, ollama_model, chunk_size, overall_label
+    def summarize_component(project, comp, rows):
+        print(f"Project {project} | Component {comp} (Summary):\n" + "-" * 40)
+        # --- Prompts for Component Summary ---
+        comp_instructions = _instructions(COMPONENT_TASK, COMPONENT_MARKDOWN_FORMAT, structured_output)
+        comp_initial_prompt = (
+            comp_instructions + f"Component: '{comp}' in project '{project}'\n\n"
+            "Bug Reports:\n{reports_csv}"
+        )
+        comp_refinement_prompt = (
+            comp_instructions + REFINEMENT_INSTRUCTION + f"Component: '{comp}' in project '{project}'\n\n"
+            "## Existing Summary:\n{previous_summary}\n\n"
+            "## New Bug Reports:\n{new_reports}"
+        )
+        return _generate_iterative_summary(
+            df, comp_initial_prompt, comp_refinement_prompt, ollama_model, chunk_size, f"Component '{comp}'",
+            telemetry=telemetry, project=project, component=comp, backend=backend,
+            structured_fields=COMPONENT_FIELDS if structured_output else None, keep_alive=keep_alive,
+            rows=rows, autotuner=autotuner, early_exit=early_exit
         )
-        overall_fields_raw = parse_llm_output(overall_summary_md)
-        project_overall_summaries[project] = {key: markdown.markdown(value) for key, value in
-                                              overall_fields_raw.items()}
 
+    def summarize_batch(project, batch):
+        print(f"Project {project} | {len(batch)} small components (Batched Summary):\n" + "-" * 40)
+        summaries = _request_batched_component_summaries(
+            df, project, batch, ollama_model, backend or get_default_backend(), structured_output,
+            chat_kwargs_for(project)
+        )
+        for comp, rows in batch:
+            if comp not in summaries and not cancelled():
+                print(f"  -> No complete block for component '{comp}' in the batched response; "
+                      "summarizing it on its own.")
+                summaries[comp] = summarize_component(project, comp, rows)
+        return summaries
+
+    def run_task(task):
+        if cancelled():
+            return None
+        kind, project, payload = task
+        if kind == 'overall':
+            return summarize_overall(project)
+        if kind == 'component':
+            comp, rows = payload
+            return {comp: summarize_component(project, comp, rows)}
+        return summarize_batch(project, payload)
+
+    # --- Plan: which summaries to request, and which copy another component's summary ---
+    # fingerprint -> list of (project, component) entries sharing that summary; the first one is requested.
+    shared_summaries = {}
+    # (project, component) -> the entries that copy its summary once it is done.
+    copies = {}
+    # Components per project still waiting for a summary (for hierarchical overall summaries).
+    pending_components = {}
+    tasks = deque()
+    for project, components in project_component_rows.items():
         project_component_summaries[project] = {}
-        for comp, sub_df in components.items():
-            # --- Prompts for Component Summary ---
-            comp_initial_prompt = (
-                f"Given the following bug reports for the '{comp}' component in project '{project}'.\n"
-                "1. Summarize the key findings and recurring issues as a bullet list, with a maximum of 5 concise bullet points.\n"
-                "2. Provide separate bulleted recommendations for developers.\n"
-                "3. Provide separate bulleted recommendations for testers.\n"
-                "4. Add a one or two sentence potential customer impact description.\n"
-                "5. Rate the customer impact as HIGH, MEDIUM, or LOW, depending on how much a customer can be affected. Only answer either of the three.\n"
-                "Respond in Markdown format, use clear section markers, do not ever respond in any other way:\n"
-                "## Summary\n(bulleted list)\n\n"
-                "## Recommendations for Developers\n(bulleted list)\n\n"
-                "## Recommendations for Testers\n(bulleted list)\n\n"
-                "## Potential Customer Impact\n(one or two sentences)\n\n"
-                "## Impact Level\n(Write: Impact: HIGH/MEDIUM/LOW)\n\n"
-                "Bug Reports:\n{{reports_csv}}"
-            )
-            comp_refinement_prompt = (
-                f"Below is an existing summary for the '{comp}' component and a new batch of reports.\n"
-                "Combine all information to create a single, new, comprehensive summary.\n"
-                "1. Summarize the key findings and recurring issues as a bullet list, with a maximum of 5 concise bullet points.\n"
-                "2. Provide separate bulleted recommendations for developers.\n"
-                "3. Provide separate bulleted recommendations for testers.\n"
-                "4. Add a one or two sentence potential customer impact description.\n"
-                "5. Rate the customer impact as HIGH, MEDIUM, or LOW, depending on how much a customer can be affected. Only answer either of the three.\n"
-                "Respond in Markdown format, use clear section markers, do not ever respond in any other way:\n"
-                "## Summary\n(bulleted list with asterisks)\n\n"
-                "## Recommendations for Developers\n(bulleted list with asterisks)\n\n"
-                "## Recommendations for Testers\n(bulleted list with asterisks)\n\n"
-                "## Potential Customer Impact\n(one or two sentences)\n\n"
-                "## Impact Level\n(Write: Impact: HIGH/MEDIUM/LOW)\n\n"
-                "## Existing Summary:\n{{previous_summary}}\n\n"
-                "## New Bug Reports:\n{{new_reports}}"
-            )
-
-            print(f"Project {project} | Component {comp} (Summary):\n" + "-" * 40)
-            component_label = f"Component '{comp}'"
-
-            comp_summary_md = _generate_iterative_summary(
-                sub_df, comp_initial_prompt, comp_refinement_prompt, ollama_model, chunk_size, component_label
-            )
-            comp_fields_raw = parse_llm_output(comp_summary_md)
-
-            comp_fields_html = {key: markdown.markdown(value) for key, value in comp_fields_raw.items()}
-            comp_fields_html['impact_level'] = comp_fields_raw.get('impact_level', 'N/A')
-            project_component_summaries[project][comp] = comp_fields_html
-
-    return project_overall_summaries, project_component_summaries
\ No newline at end of file
+        component_fields_raw[project] = {}
+        pending_components[project] = len(components)
+        if not overall_from_components:
+            tasks.append(('overall', project, None))
+
+        small_components = []
+        for comp, rows in components.items():
+            fingerprint = report_set_fingerprint(df, rows, ollama_model,
+                                                 COMPONENT_INSTRUCTIONS + REFINEMENT_INSTRUCTION,
+                                                 'auto' if autotuner is not None else chunk_size, structured_output)
+            if fingerprint in shared_summaries:
+                copies.setdefault(shared_summaries[fingerprint][0], []).append((project, comp))
+                shared_summaries[fingerprint].append((project, comp))
+                continue
+            if fingerprint is not None:
+                shared_summaries[fingerprint] = [(project, comp)]
+            if len(rows) <= batch_limit:
+                small_components.append((comp, rows))
+            else:
+                tasks.append(('component', project, (comp, rows)))
+
+        for start in range(0, len(small_components), MAX_COMPONENTS_PER_BATCH):
+            batch = small_components[start:start + MAX_COMPONENTS_PER_BATCH]
+            if len(batch) > 1:
+                tasks.append(('batch', project, batch))
+            else:
+                tasks.append(('component', project, batch[0]))
+
+    # --- Collecting results; this runs on the calling thread, so no locking is needed ---
+    def keep_component_order(project):
+        # Summaries finish out of order; keep the components in their original order.
+        order = project_component_rows[project]
+        project_component_summaries[project] = {comp: project_component_summaries[project][comp]
+                                                for comp in order if comp in project_component_summaries[project]}
+        component_fields_raw[project] = {comp: component_fields_raw[project][comp]
+                                         for comp in order if comp in component_fields_raw[project]}
+
+    def component_finished(project):
+        pending_components[project] -= 1
+        if pending_components[project] == 0:
+            keep_component_order(project)
+            if overall_from_components and not cancelled():
+                # Run it next, so each project's report completes as early as possible.
+                tasks.appendleft(('overall', project, None))
+
+    def store_component_summary(project, comp, comp_summary_md):
+        comp_fields_raw = parse_llm_output(comp_summary_md)
+        component_fields_raw[project][comp] = comp_fields_raw
+
+        comp_fields_html = {key: markdown.markdown(value) for key, value in comp_fields_raw.items()}
+        comp_fields_html['impact_level'] = comp_fields_raw.get('impact_level', 'N/A')
+        project_component_summaries[project][comp] = comp_fields_html
+        report_progress(f"Summarized: {project} | {comp}")
+        component_finished(project)
+
+        for other_project, other_comp in copies.get((project, comp), []):
+            print(f"Project {other_project} | Component {other_comp} (Summary):\n" + "-" * 40)
+            print(f"  -> Same reports as project {project} | component {comp}; reusing its summary.")
+            project_component_summaries[other_project][other_comp] = dict(comp_fields_html)
+            component_fields_raw[other_project][other_comp] = comp_fields_raw
+            report_progress(f"Reused: {other_project} | {other_comp}")
+            component_finished(other_project)
+
+    def store_result(task, result):
+        kind, project, _ = task
+        if kind == 'overall':
+            overall_fields_raw = parse_llm_output(result)
+            project_overall_summaries[project] = {key: markdown.markdown(value) for key, value in
+                                                  overall_fields_raw.items()}
+            report_progress(f"Summarized: {project}")
+            return
+        for comp, comp_summary_md in result.items():
+            store_component_summary(project, comp, comp_summary_md)
+
+    # --- Run: keep up to the in-flight limit of requests going, in plan order ---
+    max_workers = autotuner.max_concurrency if autotuner is not None else 1
+    in_flight = {}
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        while tasks or in_flight:
+            limit = autotuner.concurrency if autotuner is not None else 1
+            while tasks and len(in_flight) < limit and not cancelled():
+                task = tasks.popleft()
+                in_flight[pool.submit(run_task, task)] = task
+            if not in_flight:
+                break
+            # With an autotuner the limit can rise while every request is still running.
+            done, _ = wait(in_flight, timeout=AUTOTUNE_POLL_S if autotuner is not None else None,
+                           return_when=FIRST_COMPLETED)
+            for future in done:
+                task = in_flight.pop(future)
+                result = future.result()
+                if result is not None:
+                    store_result(task, result)
+
+    project_overall_summaries = {project: project_overall_summaries[project] for project in project_component_rows
+                                 if project in project_overall_summaries}
+
+    # Note on every copy of a shared summary where else it appears.
+    for locations in shared_summaries.values():
+        locations = [(project, comp) for project, comp in locations if comp in project_component_summaries[project]]
+        if len(locations) < 2:
+            continue
+        for project, comp in locations:
+            project_component_summaries[project][comp]['shared_with'] = [
+                (other_project, other_comp) for other_project, other_comp in locations
+                if (other_project, other_comp) != (project, comp)
+            ]
+
+    return project_overall_summaries, project_component_summaries
@@ -0,0 +1,180 @@
+import os
+import threading
+
+from telemetry import RunTelemetry
+
+# pandas, matplotlib and the LLM client are imported inside the functions below, so importing
+# this module (e.g. from the GUI) stays cheap.
+
+# --- CONFIGURATION ---
+DEFAULT_OUTPUT_DIR = './project_component_csvs'
+DEFAULT_CHUNK_SIZE = 5
+CHUNK_SIZE_MODES = ('Auto', 'Process All at Once')  # Chunk size settings besides a number of reports.
+
+# pyplot keeps the current figure in global state, so charts from reports generated at the same
+# time (e.g. by the report service) must not be drawn concurrently.
+_CHART_LOCK = threading.Lock()
+
+
+def load_dataset(csv_path, component_col, project_col, engine='pandas'):
+    """Loads and preprocesses the whole CSV; generate_report filters it to the selected projects."""
+    from preprocess import load_and_preprocess
+    return load_and_preprocess(csv_path, [component_col], project_col, engine=engine)
+
+
+def parse_keep_alive(text):
+    """Turns the 'Keep Model Loaded' setting into Ollama's keep_alive value (None for the server default)."""
+    keep_alive = str(text).strip() if text is not None else ''
+    if not keep_alive:
+        return None
+    if keep_alive.lstrip('-').isdigit():
+        return int(keep_alive)  # Bare numbers are seconds; -1 keeps the model loaded indefinitely.
+    return keep_alive
+
+
+def resolve_chunk_size(setting, report_count):
+    """
+    Turns the chunk size setting ('Auto', 'Process All at Once' or a number of reports) into
+    (chunk_size, autotuner). The autotuner is None unless the setting is 'Auto'.
+    """
+    try:
+        if setting == 'Auto':
+            # Chunk size and requests in flight are tuned from the server's responses as the run goes.
+            from autotune import Autotuner
+            autotuner = Autotuner()
+            print(f"Autotuning the chunk size (starting at {autotuner.chunk_size} reports) and requests in flight.")
+            return autotuner.chunk_size, autotuner
+        if setting == 'Process All at Once':
+            print(f"Processing all {report_count} reports in a single prompt.")
+            return report_count + 1, None
+        chunk_size = int(setting)
+        print(f"Using a chunk size of {chunk_size} reports.")
+        return chunk_size, None
+    except (ValueError, TypeError):
+        print(f"Invalid chunk size '{setting}'. Defaulting to {DEFAULT_CHUNK_SIZE}.")
+        return DEFAULT_CHUNK_SIZE, None
+
+
+def generate_report(csv_path, project_col, component_col, selected_projects, ollama_model, output_path, backend,
+                    engine='pandas', chunk_size=DEFAULT_CHUNK_SIZE, keep_alive=None, batch_threshold=0,
+                    structured_output=False, overall_from_components=False, early_exit=False, transcript_path=None,
+                    output_dir=DEFAULT_OUTPUT_DIR, cancel_event=None, progress_callback=None, all_df=None,
+                    telemetry=None):
+    """
+    Runs the whole pipeline for the selected projects: preprocessing, charts, AI summaries and
+    the HTML report, which is written to output_path along with a '.run.json' run report.
+
+    chunk_size takes the same settings as the GUI (see resolve_chunk_size) and keep_alive the
+    same text (see parse_keep_alive). Pass all_df, as returned by load_dataset, to reuse an
+    already preprocessed dataset. progress_callback(value, percent_text, status_text) is called
+    from this thread. Returns output_path, or None if there was nothing to do or cancel_event was set.
+    """
+    from preprocess import split_by_project_and_component
+    from ollama_functions import generate_summary_table, configure_transcript_log, warm_up_model
+    from webpage import build_html_report
+    from graphs import (
+        generate_reports_per_component_bar,
+        generate_resolution_pie,
+        generate_grouped_bar_chart,
+        generate_reports_over_time_line,
+    )
+
+    cancel_event = cancel_event or threading.Event()
+    progress = progress_callback or (lambda *args: None)
+    telemetry = telemetry or RunTelemetry()
+
+    selected_projects = list(selected_projects)
+    if not selected_projects:
+        print("No projects selected. Aborting.")
+        return None
+
+    print("Starting report generation...")
+
+    # Load the model on the server while we preprocess and chart, instead of on the first summary.
+    keep_alive = parse_keep_alive(keep_alive)
+    threading.Thread(target=warm_up_model, args=(ollama_model, backend, keep_alive, telemetry),
+                     daemon=True).start()
+
+    progress(0, "0%", "Loading data...")
+    with telemetry.stage('load_preprocess'):
+        if all_df is None:
+            all_df = load_dataset(csv_path, component_col, project_col, engine)
+        all_df = all_df[all_df[project_col].isin(selected_projects)]
+    print(f"Processing {len(all_df)} reports for {len(selected_projects)} selected project(s).")
+
+    projects_list = all_df[project_col].unique()
+    num_projects = len(projects_list)
+    num_component_summaries = \
+    all_df[['All_Components_List', project_col]].explode('All_Components_List').drop_duplicates().shape[0]
+    total_summary_tasks = num_projects + num_component_summaries
+
+    chart_functions = {
+        'reports_per_component': generate_reports_per_component_bar,
+        'resolution_pie': generate_resolution_pie,
+        'priority_chart': lambda d: generate_grouped_bar_chart(d, 'Priority'),
+        'severity_chart': lambda d: generate_grouped_bar_chart(d, 'Severity'),
+        'reports_over_time': generate_reports_over_time_line,
+    }
+
+    # Positions of each project's rows, found in one pass instead of a full-frame mask per project.
+    project_positions = all_df.groupby(project_col, observed=True, sort=False).indices
+
+    project_graphs = {}
+    for i, project_code in enumerate(projects_list):
+        if cancel_event.is_set(): return None
+        status_text = f"Graphing: {project_code[:35]}..."
+        progress_val = ((i + 1) / num_projects) * 10
+        progress(progress_val, f"{int(progress_val)}%", status_text)
+        project_df = all_df.take(project_positions[project_code])
+        project_graphs[project_code] = {}
+        with _CHART_LOCK:
+            for chart_name, chart_function in chart_functions.items():
+                with telemetry.stage(f'chart:{chart_name}', project=project_code):
+                    project_graphs[project_code][chart_name] = chart_function(project_df)
+
+    if cancel_event.is_set(): return None
+
+    progress(10, "10%", "Preparing AI summaries...")
+
+    chunk_size, autotuner = resolve_chunk_size(chunk_size, len(all_df))
+    if batch_threshold:
+        print(f"Components with up to {batch_threshold} reports will be summarized together.")
+
+    if not os.path.exists(output_dir): os.makedirs(output_dir)
+
+    with telemetry.stage('split_export'):
+        project_component_rows = split_by_project_and_component(all_df, project_col, output_dir)
+
+    if transcript_path:
+        transcript_path = configure_transcript_log(transcript_path)
+        print(f"Full LLM responses will be written to {os.path.abspath(transcript_path)}")
+    else:
+        configure_transcript_log(None)
+
+    with telemetry.stage('llm_summaries'):
+        project_overall_summaries, project_component_summaries = generate_summary_table(
+            all_df, project_component_rows, project_col, ollama_model, chunk_size, cancel_event,
+            progress, total_summary_tasks, telemetry, backend, structured_output=structured_output,
+            keep_alive=keep_alive, overall_from_components=overall_from_components,
+            batch_threshold=batch_threshold, autotuner=autotuner, early_exit=early_exit
+        )
+    if autotuner is not None:
+        tuned = autotuner.summary()
+        print(f"Autotune settled on chunk size {tuned['chunk_size']} with "
+              f"{tuned['concurrency']} request(s) in flight.")
+
+    if cancel_event.is_set(): return None
+
+    progress(100, "100%", "Building HTML report...")
+    with telemetry.stage('html_build'):
+        html_report = build_html_report(project_overall_summaries, project_component_summaries,
+                                        project_graphs, output_dir)
+
+    with open(output_path, 'w', encoding='utf-8') as f:
+        f.write(html_report)
+    print(f"\nReport saved to {os.path.abspath(output_path)}")
+
+    run_report_path = telemetry.write_report(os.path.splitext(output_path)[0] + '.run.json')
+    print(f"Run report saved to {os.path.abspath(run_report_path)}")
+    telemetry.write_prometheus()
+    return output_path
@@ -1,13 +1,123 @@
 import pandas as pd
+import glob
+import multiprocessing
 import os
+from concurrent.futures import ProcessPoolExecutor
 
+# Low-cardinality text columns that are stored as categoricals. Exploding multi-project reports
+# duplicates rows, and categoricals keep that from duplicating every string.
+CATEGORICAL_COLUMNS = ['Status', 'Priority', 'Severity', 'Resolution']
+DATA_ENGINES = ('pandas', 'arrow')
 
-def load_and_preprocess(csv_path, component_cols, project_col):
+# --- Multi-file exports ---
+KEY_COLUMN = 'Key'  # Issue key; a report that appears in several exports is kept once.
+UPDATED_COLUMN = 'Updated'  # When present, the row with the latest value wins; otherwise the newest file's.
+PARALLEL_READ_MIN_FILES = 4  # Below this, starting worker processes costs more than it saves.
+MAX_READ_WORKERS = 8
+
+
+def resolve_csv_paths(source):
+    """
+    Turns a CSV source into a list of files: a single file, a directory (every *.csv in it),
+    a glob pattern such as 'exports/jira_*.csv', or a list of any of these.
+    Files are ordered oldest first by modification time, so later exports win on duplicate keys.
+    """
+    if isinstance(source, (list, tuple)):
+        paths = [path for item in source for path in resolve_csv_paths(item)]
+    elif os.path.isdir(source):
+        paths = glob.glob(os.path.join(source, '*.csv'))
+    elif glob.has_magic(source):
+        paths = [path for path in glob.glob(source) if os.path.isfile(path)]
+    else:
+        paths = [source]
+    if not paths:
+        raise ValueError(f"No CSV files found for '{source}'.")
+    # The same file can be reached twice through a list; read it once.
+    paths = list(dict.fromkeys(os.path.abspath(path) for path in paths))
+    return sorted(paths, key=lambda path: (os.path.getmtime(path), path))
+
+
+def _read_export(path, text_columns, usecols):
+    """Reads one export file. Runs in a worker process, so it must stay at module level."""
+    wanted = None if usecols is None else set(usecols)
+    return pd.read_csv(path, dtype={col: str for col in text_columns}, low_memory=False,
+                       usecols=None if wanted is None else lambda col: col in wanted)
+
+
+def read_exports(paths, text_columns=(), usecols=None):
+    """
+    Reads several exports (e.g. Jira's 1,000-row pages) and merges them into one frame, in
+    parallel worker processes when there are enough files. Reports that appear more than once
+    (by KEY_COLUMN) keep their most recent row: the latest UPDATED_COLUMN if the export has it,
+    otherwise the one from the newest file. text_columns are always read as text, so codes like
+    '590' keep the same type in every file.
+    """
+    if usecols is not None:
+        usecols = list(usecols) + [KEY_COLUMN, UPDATED_COLUMN]
+    if len(paths) >= PARALLEL_READ_MIN_FILES:
+        # This runs on GUI and service worker threads; forking a threaded process can deadlock on
+        # locks held by other threads, so the workers are started fresh.
+        with ProcessPoolExecutor(max_workers=min(len(paths), os.cpu_count() or 1, MAX_READ_WORKERS),
+                                 mp_context=multiprocessing.get_context('spawn')) as pool:
+            frames = list(pool.map(_read_export, paths, [text_columns] * len(paths), [usecols] * len(paths)))
+    else:
+        frames = [_read_export(path, text_columns, usecols) for path in paths]
+    df = pd.concat(frames, ignore_index=True)
+
+    if KEY_COLUMN not in df.columns:
+        print(f"No '{KEY_COLUMN}' column; reports repeated across the {len(paths)} files are kept as they are.")
+        return df
+    recency = df
+    if UPDATED_COLUMN in df.columns:
+        # A stable sort keeps file order among rows with the same (or no) update time.
+        updated = pd.to_datetime(df[UPDATED_COLUMN], errors='coerce', format='mixed')
+        recency = df.assign(_updated=updated).sort_values('_updated', kind='stable', na_position='first')
+    # drop_duplicates hashes the keys; the last row per key is the most recent one. Rows without
+    # a key can't be matched, so they are all kept.
+    has_key = recency[KEY_COLUMN].notna()
+    latest = recency[has_key].drop_duplicates(subset=KEY_COLUMN, keep='last').index
+    latest = latest.append(recency.index[~has_key]).sort_values()
+    duplicates = len(df) - len(latest)
+    df = df.loc[latest].reset_index(drop=True)
+    print(f"Merged {len(paths)} files: {len(df)} reports ({duplicates} duplicate rows dropped).")
+    return df
+
+
+def read_source(csv_path, text_columns=(), usecols=None):
+    """Reads a CSV source (see resolve_csv_paths); several files are merged with read_exports."""
+    paths = resolve_csv_paths(csv_path)
+    if len(paths) == 1:
+        return pd.read_csv(paths[0], usecols=usecols, low_memory=False)
+    return read_exports(paths, text_columns, usecols)
+
+
+def source_signature(csv_path):
+    """
+    Identifies the current version of a CSV source: (path, modification time, size) for each of
+    its files. Changes when any export is edited, added or removed.
+    """
+    signature = []
+    for path in resolve_csv_paths(csv_path):
+        stat = os.stat(path)
+        signature.append((path, stat.st_mtime_ns, stat.st_size))
+    return tuple(signature)
+
+
+def load_and_preprocess(csv_path, component_cols, project_col, engine='pandas'):
     """
     Reads CSV, handles multi-project reports, converts dates, cleans component names,
     and prepares the data for all downstream processing.
+    csv_path may also be a directory, glob pattern or list of exports (see resolve_csv_paths),
+    which are merged into one frame first.
+    engine='arrow' does the same work with pyarrow (see arrow_engine.py).
     """
-    df = pd.read_csv(csv_path)
+    if engine == 'arrow':
+        from arrow_engine import load_and_preprocess_arrow
+        return load_and_preprocess_arrow(csv_path, component_cols, project_col)
+    if engine != 'pandas':
+        raise ValueError(f"Unknown data engine '{engine}'.")
+
+    df = read_source(csv_path, [project_col] + list(component_cols or []))
 
     # --- Step 1: Ensure required columns exist ---
     if project_col not in df.columns:
@@ -50,44 +160,43 @@ def load_and_preprocess(csv_path, component_cols, project_col):
     # Create the original comma-separated string version for splitting logic
     df['All_Components'] = df['All_Components_List'].apply(lambda x: ', '.join(x))
 
+    # --- Step 5: Store repeated text columns as categoricals to save memory ---
+    for col in [project_col, comp_col_name, 'All_Components'] + CATEGORICAL_COLUMNS:
+        if col in df.columns:
+            df[col] = df[col].astype('category')
+
     df.reset_index(drop=True, inplace=True)
     return df
 
 
 def split_by_project_and_component(df, project_col, output_dir):
     """
-    Groups data by project and component using the pre-cleaned 'All_Components'
-    field, saves a CSV for each group, and returns a nested dictionary of DataFrames.
+    Groups data by project and component using the pre-cleaned 'All_Components_List'
+    field, saves a CSV for each group, and returns a nested dictionary of row labels
+    ({project: {component: Index}}). Callers select rows from `df` with .loc as needed,
+    so no per-component copy of the data is kept around.
     """
     if not os.path.exists(output_dir):
         os.makedirs(output_dir)
 
-    project_component_dfs = {}
-
-    # Group by the exploded project column.
-    for project in df[project_col].unique():
-        project_df = df[df[project_col] == project].copy()
-
-        # Get unique components from the pre-cleaned list column
-        components = project_df.explode('All_Components_List')['All_Components_List'].unique()
-
-        project_component_dfs[project] = {}
-        for comp in components:
-            if not comp: continue
-
-            # Filter rows where the component is in our list of components for that row
-            mask = project_df['All_Components_List'].apply(lambda lst: comp in lst)
-            sub_df = project_df[mask].copy()
+    # One pass over (project, component) pairs instead of a boolean mask per component.
+    pairs = df[[project_col, 'All_Components_List']].explode('All_Components_List')
+    pairs = pairs[pairs['All_Components_List'].notna() & (pairs['All_Components_List'] != '')]
+    groups = pairs.groupby([project_col, 'All_Components_List'], observed=True, sort=False).groups
 
-            # Prepare a version for CSV export without the list-based column
-            sub_df_for_csv = sub_df.drop(columns=['All_Components_List', 'All_Components'])
+    export_columns = [c for c in df.columns if c not in ('All_Components_List', 'All_Components')]
+    project_component_rows = {}
+    # Visit groups in file order so projects and components keep their first-appearance order.
+    for (project, comp), rows in sorted(groups.items(), key=lambda item: item[1].min()):
+        # A row can list the same component twice (e.g. "590_SC, SC"); keep it once, in file order.
+        rows = rows.unique().sort_values()
 
-            safe_project = str(project)
-            safe_comp = comp.replace(" ", "_").replace("/", "_")
-            csv_filename = f'{safe_project}_{safe_comp}.csv'
-            csv_path = os.path.join(output_dir, csv_filename)
-            sub_df_for_csv.to_csv(csv_path, index=False)
+        safe_project = str(project)
+        safe_comp = comp.replace(" ", "_").replace("/", "_")
+        csv_filename = f'{safe_project}_{safe_comp}.csv'
+        csv_path = os.path.join(output_dir, csv_filename)
+        df.loc[rows, export_columns].to_csv(csv_path, index=False)
 
-            project_component_dfs[project][comp] = sub_df
+        project_component_rows.setdefault(project, {})[comp] = rows
 
-    return project_component_dfs
\ No newline at end of file
+    return project_component_rows
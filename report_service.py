@@ -0,0 +1,493 @@
+import argparse
+import glob
+import hashlib
+import json
+import os
+import queue
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.error import HTTPError
+from urllib.parse import urlsplit
+from urllib.request import Request, urlopen
+
+from llm_backends import BACKEND_TYPES, ConcurrencyLimitedBackend, create_backend
+
+# --- CONFIGURATION ---
+SERVICE_HOST = '127.0.0.1'  # Only local clients by default; the service reads CSVs from this machine's disk.
+SERVICE_PORT = 8765
+SERVICE_DIR = 'report_service'  # Holds the job list (jobs.json) and each job's report and CSVs.
+JOB_WORKERS = 2  # Jobs prepared at once; their LLM calls still share MAX_LLM_REQUESTS.
+MAX_LLM_REQUESTS = 1  # LLM requests in flight across all jobs; raise to match the server's OLLAMA_NUM_PARALLEL.
+DATASET_CACHE_SIZE = 4  # Preprocessed datasets kept in memory for later jobs on the same CSV.
+SERVICE_POLL_INTERVAL_S = 1.0  # How often clients check on a submitted job.
+
+JOB_STATUSES = ('queued', 'running', 'done', 'failed', 'cancelled')
+FINISHED_STATUSES = ('done', 'failed', 'cancelled')
+
+# Job settings a client may send, with their defaults. They mirror pipeline.generate_report.
+JOB_DEFAULTS = {
+    'projects': None,  # None summarizes every project in the CSV.
+    'engine': 'pandas',
+    'chunk_size': '5',
+    'keep_alive': '30m',
+    'batch_threshold': 0,
+    'structured_output': False,
+    'overall_from_components': False,
+    'early_exit': False,
+}
+REQUIRED_JOB_FIELDS = ('csv_path', 'project_col', 'component_col', 'model')
+
+
+def _normalize_request(data):
+    """Validates a submitted job and fills in defaults. Raises ValueError for a bad request."""
+    if not isinstance(data, dict):
+        raise ValueError("The job must be a JSON object.")
+    missing = [field for field in REQUIRED_JOB_FIELDS if not data.get(field)]
+    if missing:
+        raise ValueError(f"Missing required field(s): {', '.join(missing)}.")
+    unknown = set(data) - set(REQUIRED_JOB_FIELDS) - set(JOB_DEFAULTS)
+    if unknown:
+        raise ValueError(f"Unknown field(s): {', '.join(sorted(unknown))}.")
+
+    from pipeline import CHUNK_SIZE_MODES
+    from preprocess import DATA_ENGINES, resolve_csv_paths
+
+    request = {**JOB_DEFAULTS, **data}
+    not_text = [field for field in REQUIRED_JOB_FIELDS + ('engine',) if not isinstance(request[field], str)]
+    if not_text:
+        raise ValueError(f"Field(s) must be text: {', '.join(not_text)}.")
+    request['csv_path'] = os.path.abspath(request['csv_path'])
+    # A directory or glob of exports is accepted as well as a single file.
+    if not os.path.exists(request['csv_path']) and not glob.has_magic(request['csv_path']):
+        raise ValueError(f"CSV file '{request['csv_path']}' not found on the service's machine.")
+    resolve_csv_paths(request['csv_path'])
+    if request['projects'] is not None:
+        if not isinstance(request['projects'], list):
+            raise ValueError("'projects' must be a list of project codes.")
+        # Order doesn't change the report, so sort it for deduplication.
+        request['projects'] = sorted(str(project) for project in request['projects'])
+    if request['engine'] not in DATA_ENGINES:
+        raise ValueError(f"'engine' must be one of: {', '.join(DATA_ENGINES)}.")
+    request['chunk_size'] = str(request['chunk_size'])
+    if request['chunk_size'] not in CHUNK_SIZE_MODES and not (request['chunk_size'].isdigit()
+                                                              and int(request['chunk_size']) > 0):
+        raise ValueError(f"'chunk_size' must be a positive number of reports or one of: "
+                         f"{', '.join(CHUNK_SIZE_MODES)}.")
+    request['keep_alive'] = None if request['keep_alive'] is None else str(request['keep_alive'])
+    try:
+        request['batch_threshold'] = int(request['batch_threshold'] or 0)
+    except (TypeError, ValueError):
+        raise ValueError("'batch_threshold' must be a number of reports.") from None
+    request['structured_output'] = bool(request['structured_output'])
+    request['overall_from_components'] = bool(request['overall_from_components'])
+    request['early_exit'] = bool(request['early_exit'])
+    return request
+
+
+def _job_key(request):
+    """Identifies identical jobs: the same settings on the same version of the CSV file(s)."""
+    from preprocess import source_signature
+
+    key = json.dumps({'request': request, 'csv_files': source_signature(request['csv_path'])}, sort_keys=True)
+    return hashlib.sha256(key.encode('utf-8')).hexdigest()
+
+
+class DatasetCache:
+    """
+    Keeps the most recently used preprocessed datasets in memory, keyed by the CSV files (path,
+    modification time and size of each) and the column mapping, so later jobs skip reading and
+    preprocessing. Jobs that need the same dataset at the same time wait for a single load.
+    """
+
+    def __init__(self, max_entries=DATASET_CACHE_SIZE):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._loading = {}
+        self._lock = threading.Lock()
+
+    def get(self, csv_path, component_col, project_col, engine='pandas'):
+        from pipeline import load_dataset
+        from preprocess import source_signature
+
+        key = (source_signature(csv_path), component_col, project_col, engine)
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                print(f"Reusing the preprocessed dataset for {os.path.basename(csv_path)}.")
+                return self._entries[key]
+            load_lock = self._loading.setdefault(key, threading.Lock())
+
+        with load_lock:
+            with self._lock:
+                if key in self._entries:
+                    self._entries.move_to_end(key)
+                    return self._entries[key]
+            df = load_dataset(csv_path, component_col, project_col, engine)
+            with self._lock:
+                self._entries[key] = df
+                self._loading.pop(key, None)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+        return df
+
+
+class ReportService:
+    """
+    Generates reports for submitted jobs on a few worker threads, sharing one LLM backend whose
+    requests are limited to max_llm_requests at once across all jobs.
+
+    Jobs are kept in <directory>/jobs.json, so queued jobs, and jobs that were running when the
+    service stopped, are picked up again on restart. A job identical to one that is queued,
+    running or done (with its report still on disk) is not run again; the existing job is returned.
+    """
+
+    def __init__(self, backend, directory=SERVICE_DIR, job_workers=JOB_WORKERS, max_llm_requests=MAX_LLM_REQUESTS,
+                 dataset_cache_size=DATASET_CACHE_SIZE):
+        self.backend = ConcurrencyLimitedBackend(backend, max_llm_requests)
+        self.directory = os.path.abspath(directory)
+        self.datasets = DatasetCache(dataset_cache_size)
+        self.jobs = {}
+        self._cancel_events = {}
+        self._lock = threading.Lock()
+        self._queue = queue.Queue()
+        self._jobs_path = os.path.join(self.directory, 'jobs.json')
+        os.makedirs(self.directory, exist_ok=True)
+        self._load_jobs()
+        self._workers = [threading.Thread(target=self._work, daemon=True) for _ in range(job_workers)]
+
+    def start(self):
+        for worker in self._workers:
+            worker.start()
+        return self
+
+    # --- Job list persistence ---
+    def _load_jobs(self):
+        if not os.path.exists(self._jobs_path):
+            return
+        with open(self._jobs_path, encoding='utf-8') as f:
+            jobs = json.load(f).get('jobs', [])
+        for job in jobs:
+            if job['status'] in ('queued', 'running'):
+                # Interrupted by a restart: run it again from the start.
+                job.update(status='queued', progress=0, status_text='Queued', started_at=None)
+                self._cancel_events[job['id']] = threading.Event()
+                self._queue.put(job['id'])
+            self.jobs[job['id']] = job
+        if self.jobs:
+            print(f"Loaded {len(self.jobs)} job(s) from {self._jobs_path}; {self._queue.qsize()} queued.")
+
+    def _save_jobs(self):
+        """Writes the job list. Call with self._lock held."""
+        # Write to a temp file first so a crash never leaves a partial job list.
+        tmp_path = f'{self._jobs_path}.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'jobs': list(self.jobs.values())}, f, indent=2)
+        os.replace(tmp_path, self._jobs_path)
+
+    # --- Public API, used by the HTTP handler ---
+    def submit(self, data):
+        """Queues a job, or returns the identical existing one. Returns (job, deduplicated)."""
+        request = _normalize_request(data)
+        key = _job_key(request)
+        with self._lock:
+            for job in self.jobs.values():
+                if job['key'] != key:
+                    continue
+                if job['status'] in ('queued', 'running') or \
+                        (job['status'] == 'done' and os.path.exists(job['report_path'])):
+                    job['submissions'] += 1
+                    self._save_jobs()
+                    return dict(job), True
+
+            job_id = uuid.uuid4().hex[:12]
+            job_dir = os.path.join(self.directory, 'jobs', job_id)
+            job = {
+                'id': job_id,
+                'key': key,
+                'status': 'queued',
+                'request': request,
+                'submitted_at': time.time(),
+                'started_at': None,
+                'finished_at': None,
+                'submissions': 1,
+                'progress': 0,
+                'status_text': 'Queued',
+                'error': None,
+                'report_path': os.path.join(job_dir, 'report.html'),
+            }
+            self.jobs[job_id] = job
+            self._cancel_events[job_id] = threading.Event()
+            self._save_jobs()
+        self._queue.put(job_id)
+        print(f"Queued job {job_id} for {os.path.basename(request['csv_path'])}.")
+        return dict(job), False
+
+    def get(self, job_id):
+        with self._lock:
+            job = self.jobs.get(job_id)
+            return None if job is None else dict(job)
+
+    def list(self):
+        with self._lock:
+            return [dict(job) for job in self.jobs.values()]
+
+    def cancel(self, job_id):
+        """
+        Withdraws one submission of the job. The job itself is only cancelled once every client
+        that submitted it has withdrawn.
+        """
+        with self._lock:
+            job = self.jobs.get(job_id)
+            if job is None:
+                return None
+            if job['status'] in FINISHED_STATUSES:
+                return dict(job)
+            job['submissions'] = max(job['submissions'] - 1, 0)
+            if job['submissions'] == 0:
+                self._cancel_events[job_id].set()
+                if job['status'] == 'queued':
+                    job.update(status='cancelled', status_text='Cancelled', finished_at=time.time())
+            self._save_jobs()
+            return dict(job)
+
+    # --- Workers ---
+    def _work(self):
+        while True:
+            job_id = self._queue.get()
+            try:
+                self._run_job(job_id)
+            except Exception as e:
+                # _run_job catches errors from the report itself; this keeps anything else (e.g. an
+                # unwritable job directory) from taking the worker down with it.
+                error = f'{type(e).__name__}: {e}'
+                print(f"\n--- ERROR IN JOB {job_id} ---\n{error}")
+                with self._lock:
+                    self.jobs[job_id].update(status='failed', error=error, status_text='Failed',
+                                             finished_at=time.time())
+                    try:
+                        self._save_jobs()
+                    except OSError as save_error:
+                        print(f"Could not save the job list: {save_error}")
+
+    def _set_progress(self, job_id, value, percent_text, status_text):
+        with self._lock:
+            self.jobs[job_id].update(progress=value, status_text=status_text)
+
+    def _run_job(self, job_id):
+        from pipeline import generate_report
+
+        with self._lock:
+            job = self.jobs[job_id]
+            if job['status'] != 'queued':
+                return  # Cancelled while it waited.
+            job.update(status='running', status_text='Starting...', started_at=time.time())
+            self._save_jobs()
+            request = job['request']
+            cancel_event = self._cancel_events[job_id]
+
+        print(f"\n=== Job {job_id}: {os.path.basename(request['csv_path'])} ===")
+        job_dir = os.path.dirname(job['report_path'])
+        os.makedirs(job_dir, exist_ok=True)
+        status, error = 'failed', None
+        try:
+            all_df = self.datasets.get(request['csv_path'], request['component_col'], request['project_col'],
+                                       request['engine'])
+            projects = request['projects']
+            if projects is None:
+                projects = [project for project in all_df[request['project_col']].unique() if project]
+            output_file = generate_report(
+                request['csv_path'], request['project_col'], request['component_col'], projects,
+                request['model'], job['report_path'], self.backend, engine=request['engine'],
+                chunk_size=request['chunk_size'], keep_alive=request['keep_alive'],
+                batch_threshold=request['batch_threshold'], structured_output=request['structured_output'],
+                overall_from_components=request['overall_from_components'], early_exit=request['early_exit'],
+                output_dir=os.path.join(job_dir, 'csvs'), cancel_event=cancel_event,
+                progress_callback=lambda *args: self._set_progress(job_id, *args), all_df=all_df,
+            )
+            if output_file:
+                status = 'done'
+            elif cancel_event.is_set():
+                status = 'cancelled'
+            else:
+                error = 'None of the selected projects has any reports.'
+        except Exception as e:
+            error = f'{type(e).__name__}: {e}'
+            print(f"\n--- ERROR IN JOB {job_id} ---\n{error}")
+
+        with self._lock:
+            job.update(status=status, error=error, finished_at=time.time(),
+                       status_text={'done': 'Finished!', 'cancelled': 'Cancelled'}.get(status, 'Failed'))
+            if status == 'done':
+                job['progress'] = 100
+            self._save_jobs()
+        print(f"=== Job {job_id}: {status} ===")
+
+
+def _make_handler(service):
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, format, *args):
+            pass  # Job progress is printed instead.
+
+        def _send(self, body, content_type, status=200):
+            body = body.encode('utf-8')
+            self.send_response(status)
+            self.send_header('Content-Type', content_type)
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def _send_json(self, payload, status=200):
+            self._send(json.dumps(payload), 'application/json', status)
+
+        def _job_or_404(self, job_id):
+            job = service.get(job_id)
+            if job is None:
+                self._send_json({'error': f"No job '{job_id}'."}, status=404)
+            return job
+
+        def do_GET(self):
+            parts = urlsplit(self.path).path.strip('/').split('/')
+            if parts == ['health']:
+                self._send_json({'status': 'ok'})
+            elif parts == ['jobs']:
+                self._send_json({'jobs': service.list()})
+            elif len(parts) == 2 and parts[0] == 'jobs':
+                job = self._job_or_404(parts[1])
+                if job is not None:
+                    self._send_json(job)
+            elif len(parts) == 3 and parts[0] == 'jobs' and parts[2] == 'report':
+                job = self._job_or_404(parts[1])
+                if job is None:
+                    return
+                if job['status'] != 'done' or not os.path.exists(job['report_path']):
+                    self._send_json({'error': f"Job '{job['id']}' has no report ({job['status']})."}, status=409)
+                    return
+                with open(job['report_path'], encoding='utf-8') as f:
+                    self._send(f.read(), 'text/html; charset=utf-8')
+            else:
+                self._send_json({'error': 'not found'}, status=404)
+
+        def do_POST(self):
+            parts = urlsplit(self.path).path.strip('/').split('/')
+            if parts == ['jobs']:
+                try:
+                    length = int(self.headers.get('Content-Length') or 0)
+                    job, deduplicated = service.submit(json.loads(self.rfile.read(length) or b'{}'))
+                except (ValueError, OSError) as e:
+                    self._send_json({'error': str(e)}, status=400)
+                    return
+                self._send_json({**job, 'deduplicated': deduplicated}, status=200 if deduplicated else 201)
+            elif len(parts) == 3 and parts[0] == 'jobs' and parts[2] == 'cancel':
+                job = service.cancel(parts[1])
+                if job is None:
+                    self._send_json({'error': f"No job '{parts[1]}'."}, status=404)
+                else:
+                    self._send_json(job)
+            else:
+                self._send_json({'error': 'not found'}, status=404)
+
+    return Handler
+
+
+def serve(service, host=SERVICE_HOST, port=SERVICE_PORT):
+    """Creates the HTTP server for a ReportService; call serve_forever() on the result."""
+    server = ThreadingHTTPServer((host, port), _make_handler(service))
+    server.daemon_threads = True
+    return server
+
+
+class ReportServiceClient:
+    """Submits jobs to a running report service and follows them. Uses only the standard library."""
+
+    def __init__(self, url, timeout=30.0):
+        self.url = url.rstrip('/')
+        self.timeout = timeout
+
+    def _request(self, method, path, payload=None):
+        data = None if payload is None else json.dumps(payload).encode('utf-8')
+        request = Request(self.url + path, data=data, method=method,
+                          headers={'Content-Type': 'application/json'} if data is not None else {})
+        try:
+            with urlopen(request, timeout=self.timeout) as response:
+                body = response.read().decode('utf-8')
+                content_type = response.headers.get('Content-Type', '')
+        except HTTPError as e:
+            try:
+                message = json.loads(e.read().decode('utf-8')).get('error')
+            except ValueError:
+                message = None
+            raise RuntimeError(f"Report service error {e.code}: {message or e.reason}") from None
+        return json.loads(body) if content_type.startswith('application/json') else body
+
+    def submit(self, job):
+        """Submits a job (see JOB_DEFAULTS and REQUIRED_JOB_FIELDS). The result has a 'deduplicated' flag."""
+        return self._request('POST', '/jobs', job)
+
+    def get(self, job_id):
+        return self._request('GET', f'/jobs/{job_id}')
+
+    def cancel(self, job_id):
+        return self._request('POST', f'/jobs/{job_id}/cancel')
+
+    def report(self, job_id):
+        """Returns the finished job's HTML report."""
+        return self._request('GET', f'/jobs/{job_id}/report')
+
+    def wait(self, job_id, cancel_event=None, progress_callback=None, poll_interval=SERVICE_POLL_INTERVAL_S):
+        """
+        Polls the job until it finishes and returns it. progress_callback gets the same
+        (value, percent_text, status_text) arguments as in the pipeline. Setting cancel_event
+        withdraws this client's submission of the job.
+        """
+        cancel_sent = False
+        while True:
+            job = self.get(job_id)
+            if progress_callback is not None:
+                progress_callback(job['progress'], f"{int(job['progress'])}%", job['status_text'] or '')
+            if job['status'] in FINISHED_STATUSES:
+                return job
+            if cancel_event is not None and cancel_event.is_set() and not cancel_sent:
+                job = self.cancel(job_id)
+                cancel_sent = True
+                if job['status'] not in FINISHED_STATUSES and job['submissions'] > 0:
+                    # Someone else still wants this report; stop following it without cancelling it.
+                    return job
+                continue
+            time.sleep(poll_interval)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Run the bug report summarizer as a local report service.')
+    parser.add_argument('--host', default=SERVICE_HOST)
+    parser.add_argument('--port', type=int, default=SERVICE_PORT)
+    parser.add_argument('--backend', choices=BACKEND_TYPES, default=BACKEND_TYPES[0], help='LLM backend type.')
+    parser.add_argument('--location', help='Server URL, or the recordings directory for the replay backends.')
+    parser.add_argument('--directory', default=SERVICE_DIR, help='Where the job list and reports are kept.')
+    parser.add_argument('--workers', type=int, default=JOB_WORKERS, help='Jobs prepared at once.')
+    parser.add_argument('--max-llm-requests', type=int, default=MAX_LLM_REQUESTS,
+                        help='LLM requests in flight across all jobs.')
+    parser.add_argument('--dataset-cache-size', type=int, default=DATASET_CACHE_SIZE,
+                        help='Preprocessed datasets kept in memory.')
+    args = parser.parse_args(argv)
+
+    backend = create_backend(args.backend, args.location)
+    service = ReportService(backend, directory=args.directory, job_workers=args.workers,
+                            max_llm_requests=args.max_llm_requests,
+                            dataset_cache_size=args.dataset_cache_size).start()
+    server = serve(service, args.host, args.port)
+    print(f"Report service listening on http://{args.host}:{server.server_address[1]} "
+          f"({args.max_llm_requests} LLM request(s) at a time).")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        backend.close()
+
+
+if __name__ == '__main__':
+    main()
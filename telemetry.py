@@ -0,0 +1,184 @@
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+# --- CONFIGURATION ---
+# Set this to a file path (e.g. a node_exporter textfile collector directory) to also
+# write the run totals in Prometheus text exposition format.
+PROMETHEUS_TEXTFILE_PATH = None
+
+# Token/duration fields returned by Ollama's /api/chat that we keep for each call.
+LLM_RESPONSE_FIELDS = ('prompt_eval_count', 'eval_count', 'prompt_eval_duration', 'eval_duration', 'load_duration')
+
+
+def _empty_totals():
+    totals = {'wall_time_s': 0.0, 'llm_calls': 0}
+    totals.update({field: 0 for field in LLM_RESPONSE_FIELDS})
+    return totals
+
+
+class RunTelemetry:
+    """
+    Collects wall-time per pipeline stage and token accounting for every LLM call of a
+    single report run, and writes it out as a JSON run report.
+    """
+
+    def __init__(self):
+        self.started_at = time.time()
+        self.stages = []
+        self.llm_calls = []
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def stage(self, name, project=None, component=None):
+        """Times the enclosed block and records it under the given stage name."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record_stage(name, time.perf_counter() - start, project=project, component=component)
+
+    def record_stage(self, name, wall_time_s, project=None, component=None):
+        """Records a stage that was timed elsewhere, e.g. on another thread."""
+        with self._lock:
+            self.stages.append({
+                'stage': name,
+                'project': None if project is None else str(project),
+                'component': None if component is None else str(component),
+                'wall_time_s': wall_time_s,
+            })
+
+    def record_llm_call(self, response, wall_time_s, project=None, component=None, label=None, components=None):
+        """
+        Records the timing and token counts Ollama returned for a single chat call.
+        A call made for several components at once passes components as {component: share}; the
+        per-component totals then split its time and tokens by those shares.
+        """
+        call = {
+            'label': label,
+            'project': None if project is None else str(project),
+            'component': None if component is None else str(component),
+            'wall_time_s': wall_time_s,
+        }
+        if components:
+            call['components'] = {str(comp): share for comp, share in components.items()}
+        for field in LLM_RESPONSE_FIELDS:
+            try:
+                call[field] = response.get(field) or 0
+            except AttributeError:
+                call[field] = 0
+        # Time to first token: loading the model plus evaluating the prompt (Ollama reports nanoseconds).
+        call['ttft_s'] = (call['load_duration'] + call['prompt_eval_duration']) / 1e9
+        with self._lock:
+            self.llm_calls.append(call)
+
+    def _aggregate(self):
+        """
+        Builds per-stage, per-project and per-component totals. A call shared by several components
+        counts once in llm_calls for each of them, so summing the per-component llm_calls overcounts
+        batched calls; the run and per-project totals count every call once.
+        """
+        per_stage = {}
+        per_project = {}
+        per_component = {}
+
+        def add(bucket, key, record, is_llm, share=None):
+            totals = bucket.setdefault(key, _empty_totals())
+            totals['wall_time_s'] += record['wall_time_s'] if share is None else record['wall_time_s'] * share
+            if is_llm:
+                totals['llm_calls'] += 1
+                for field in LLM_RESPONSE_FIELDS:
+                    # Token counts and Ollama's nanosecond durations stay whole numbers when split.
+                    totals[field] += record[field] if share is None else round(record[field] * share)
+
+        with self._lock:
+            stages = list(self.stages)
+            llm_calls = list(self.llm_calls)
+
+        for record in stages:
+            add(per_stage, record['stage'], record, is_llm=False)
+            if record['project'] is not None:
+                add(per_project, record['project'], record, is_llm=False)
+                if record['component'] is not None:
+                    add(per_component, f"{record['project']}/{record['component']}", record, is_llm=False)
+        for record in llm_calls:
+            add(per_stage, 'llm_call', record, is_llm=True)
+            if record['project'] is not None:
+                add(per_project, record['project'], record, is_llm=True)
+                if record['component'] is not None:
+                    add(per_component, f"{record['project']}/{record['component']}", record, is_llm=True)
+                for comp, share in record.get('components', {}).items():
+                    add(per_component, f"{record['project']}/{comp}", record, is_llm=True, share=share)
+
+        return per_stage, per_project, per_component
+
+    def to_dict(self):
+        per_stage, per_project, per_component = self._aggregate()
+        run_totals = _empty_totals()
+        run_totals['wall_time_s'] = time.time() - self.started_at
+        llm_totals = per_stage.get('llm_call', _empty_totals())
+        for field in ('llm_calls',) + LLM_RESPONSE_FIELDS:
+            run_totals[field] = llm_totals[field]
+
+        with self._lock:
+            stage_timings = list(self.stages)
+            llm_calls = list(self.llm_calls)
+        ttfts = [call['ttft_s'] for call in llm_calls]
+        run_totals['ttft_first_s'] = ttfts[0] if ttfts else 0.0
+        run_totals['ttft_mean_s'] = sum(ttfts) / len(ttfts) if ttfts else 0.0
+
+        return {
+            'started_at': self.started_at,
+            'totals': run_totals,
+            'stages': per_stage,
+            'projects': per_project,
+            'components': per_component,
+            'stage_timings': stage_timings,
+            'llm_calls': llm_calls,
+        }
+
+    def write_report(self, path):
+        """Writes the machine-readable JSON run report."""
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(), f, indent=2)
+        return path
+
+    def write_prometheus(self, path=None):
+        """Writes the run totals as a Prometheus textfile. Does nothing if no path is configured."""
+        path = path or PROMETHEUS_TEXTFILE_PATH
+        if not path:
+            return None
+
+        report = self.to_dict()
+        lines = [
+            '# HELP bug_report_stage_seconds Wall time spent in each pipeline stage.',
+            '# TYPE bug_report_stage_seconds gauge',
+        ]
+        for stage, totals in report['stages'].items():
+            lines.append(f'bug_report_stage_seconds{{stage="{stage}"}} {totals["wall_time_s"]:.6f}')
+
+        lines += [
+            '# HELP bug_report_llm_tokens Tokens processed by the LLM per project.',
+            '# TYPE bug_report_llm_tokens gauge',
+        ]
+        for project, totals in report['projects'].items():
+            lines.append(f'bug_report_llm_tokens{{project="{project}",kind="prompt"}} {totals["prompt_eval_count"]}')
+            lines.append(f'bug_report_llm_tokens{{project="{project}",kind="eval"}} {totals["eval_count"]}')
+
+        lines += [
+            '# HELP bug_report_llm_calls Number of LLM chat calls in the last run.',
+            '# TYPE bug_report_llm_calls gauge',
+            f'bug_report_llm_calls {report["totals"]["llm_calls"]}',
+            '# HELP bug_report_run_seconds Total wall time of the last run.',
+            '# TYPE bug_report_run_seconds gauge',
+            f'bug_report_run_seconds {report["totals"]["wall_time_s"]:.6f}',
+        ]
+
+        # Write to a temp file first so the collector never reads a partial file.
+        tmp_path = f'{path}.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write('\n'.join(lines) + '\n')
+        os.replace(tmp_path, path)
+        return path
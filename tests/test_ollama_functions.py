@@ -0,0 +1,69 @@
+import json
+
+from ollama_functions import (
+    COMPONENT_FIELDS,
+    OVERALL_FIELDS,
+    parse_llm_output,
+    parse_structured_output,
+    sections_to_markdown,
+    split_batched_output,
+)
+
+
+def test_structured_output_round_trips_to_the_markdown_sections():
+    raw = json.dumps({
+        'summary': ['LED stays on after pause', '- OTA rollback is accepted'],
+        'rec_devs': ['Check the pause state machine'],
+        'rec_testers': 'Cover auto pause with the filter removed',
+        'customer_impact': ' Users see the wrong state. ',
+        'impact_level': 'Impact: high',
+    })
+
+    sections, invalid_fields = parse_structured_output(raw, COMPONENT_FIELDS)
+
+    assert invalid_fields == []
+    assert sections['summary'] == '- LED stays on after pause\n- OTA rollback is accepted'
+    # A single string for a bulleted section becomes one bullet.
+    assert sections['rec_testers'] == '- Cover auto pause with the filter removed'
+    assert sections['customer_impact'] == 'Users see the wrong state.'
+    assert sections['impact_level'] == 'HIGH'
+    assert parse_llm_output(sections_to_markdown(sections, COMPONENT_FIELDS)) == sections
+
+
+def test_structured_output_reports_missing_and_invalid_fields():
+    raw = json.dumps({'summary': [], 'rec_devs': ['Fix it'], 'customer_impact': '', 'impact_level': 'severe'})
+
+    sections, invalid_fields = parse_structured_output(raw, COMPONENT_FIELDS)
+
+    assert sections == {'rec_devs': '- Fix it'}
+    assert invalid_fields == ['summary', 'rec_testers', 'customer_impact', 'impact_level']
+
+
+def test_structured_output_that_is_not_a_json_object_is_all_invalid():
+    for raw in ('## Summary\n- markdown instead', '["a list"]', None):
+        assert parse_structured_output(raw, OVERALL_FIELDS) == ({}, list(OVERALL_FIELDS))
+
+
+def test_batched_output_is_split_per_component():
+    raw = (
+        "Here are the summaries.\n"
+        "=== COMPONENT: SC ===\n## Summary\n- SC issue\n=== END COMPONENT ===\n"
+        "ignored text between blocks\n"
+        "=== COMPONENT: **Wifi** ===\n## Summary\n- Wi-Fi issue\n=== END COMPONENT ===\n"
+    )
+
+    blocks = split_batched_output(raw, ['SC', 'WiFi', 'BLE'])
+
+    # Names are matched loosely, and components without a block are left out.
+    assert blocks == {'SC': '## Summary\n- SC issue', 'WiFi': '## Summary\n- Wi-Fi issue'}
+    assert parse_llm_output(blocks['WiFi'])['summary'] == '- Wi-Fi issue'
+
+
+def test_batched_output_keeps_the_first_block_and_ends_an_unclosed_one_at_the_next_start():
+    raw = (
+        "=== COMPONENT: SC ===\n## Summary\n- first\n"
+        "=== COMPONENT: SC ===\n## Summary\n- repeated\n=== END COMPONENT ===\n"
+        "=== COMPONENT: Unknown ===\n## Summary\n- not requested\n"
+    )
+
+    assert split_batched_output(raw, ['SC']) == {'SC': '## Summary\n- first'}
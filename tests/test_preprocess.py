@@ -0,0 +1,86 @@
+import os
+
+import pandas as pd
+import pytest
+
+from preprocess import PARALLEL_READ_MIN_FILES, read_exports, resolve_csv_paths
+
+
+def write_page(directory, name, rows, mtime):
+    """Writes one export page and sets its modification time, which decides which file is newest."""
+    path = os.path.join(directory, name)
+    pd.DataFrame(rows).to_csv(path, index=False)
+    os.utime(path, (mtime, mtime))
+    return path
+
+
+def by_key(df):
+    return {row['Key']: row for row in df.to_dict('records')}
+
+
+def test_latest_updated_row_wins_regardless_of_file_order(tmp_path):
+    newer_file = write_page(tmp_path, 'page2.csv', [
+        {'Key': 'BUG-1', 'Summary': 'stale copy', 'Updated': '2024-01-01 10:00'},
+    ], mtime=2_000)
+    older_file = write_page(tmp_path, 'page1.csv', [
+        {'Key': 'BUG-1', 'Summary': 'latest edit', 'Updated': '2024-03-01 10:00'},
+        {'Key': 'BUG-2', 'Summary': 'only once', 'Updated': '2024-01-05 10:00'},
+    ], mtime=1_000)
+
+    df = read_exports(resolve_csv_paths([newer_file, older_file]))
+
+    assert len(df) == 2
+    assert by_key(df)['BUG-1']['Summary'] == 'latest edit'
+
+
+def test_newest_file_wins_without_updated_column(tmp_path):
+    write_page(tmp_path, 'b_old.csv', [{'Key': 'BUG-1', 'Summary': 'old export'}], mtime=1_000)
+    write_page(tmp_path, 'a_new.csv', [{'Key': 'BUG-1', 'Summary': 'new export'}], mtime=2_000)
+
+    df = read_exports(resolve_csv_paths(str(tmp_path)))
+
+    assert df['Summary'].tolist() == ['new export']
+
+
+def test_rows_without_key_are_all_kept(tmp_path):
+    write_page(tmp_path, 'page1.csv', [
+        {'Key': None, 'Summary': 'no key A'},
+        {'Key': 'BUG-1', 'Summary': 'keyed'},
+    ], mtime=1_000)
+    write_page(tmp_path, 'page2.csv', [
+        {'Key': None, 'Summary': 'no key B'},
+        {'Key': 'BUG-1', 'Summary': 'keyed again'},
+    ], mtime=2_000)
+
+    df = read_exports(resolve_csv_paths(str(tmp_path)))
+
+    assert sorted(df['Summary']) == ['keyed again', 'no key A', 'no key B']
+
+
+def test_overlapping_pages_read_in_parallel_merge_like_one_export(tmp_path):
+    # Jira-style pages that overlap by one report at each boundary.
+    reports = [{'Key': f'BUG-{i}', 'Summary': f'report {i}', 'Project List': '590'} for i in range(40)]
+    page_count = PARALLEL_READ_MIN_FILES + 1
+    for page in range(page_count):
+        write_page(tmp_path, f'page{page}.csv', reports[page * 8:page * 8 + 9], mtime=1_000 + page)
+
+    df = read_exports(resolve_csv_paths(os.path.join(str(tmp_path), 'page*.csv')), ['Project List'])
+
+    assert sorted(df['Key'], key=lambda key: int(key.split('-')[1])) == [report['Key'] for report in reports]
+    # Text columns keep their type in every file, so codes like '590' are not turned into numbers.
+    assert set(df['Project List']) == {'590'}
+
+
+def test_resolve_csv_paths_orders_files_oldest_first(tmp_path):
+    newest = write_page(tmp_path, 'a.csv', [{'Key': 'BUG-1'}], mtime=3_000)
+    oldest = write_page(tmp_path, 'b.csv', [{'Key': 'BUG-2'}], mtime=1_000)
+    (tmp_path / 'notes.txt').write_text('not an export')
+
+    assert resolve_csv_paths(str(tmp_path)) == [oldest, newest]
+    # The same file listed twice is only read once.
+    assert resolve_csv_paths([newest, oldest, newest]) == [oldest, newest]
+
+
+def test_resolve_csv_paths_rejects_a_pattern_without_matches(tmp_path):
+    with pytest.raises(ValueError):
+        resolve_csv_paths(os.path.join(str(tmp_path), '*.csv'))
@@ -0,0 +1,27 @@
+import os
+
+import pytest
+
+from report_service import _normalize_request
+
+PROJECT_DATA = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'project_data.csv')
+JOB = {'csv_path': PROJECT_DATA, 'project_col': 'Project List', 'component_col': 'Component/s', 'model': 'm'}
+
+
+@pytest.mark.parametrize('fields', [
+    {'csv_path': 123},
+    {'engine': 'nope'},
+    {'chunk_size': 'abc'},
+    {'chunk_size': 0},
+    {'chunk_size': '-3'},
+])
+def test_bad_jobs_are_rejected_at_submit_time(fields):
+    with pytest.raises(ValueError):
+        _normalize_request({**JOB, **fields})
+
+
+@pytest.mark.parametrize('chunk_size', ['Auto', 'Process All at Once', 12, '25'])
+def test_chunk_size_settings_are_accepted(chunk_size):
+    request = _normalize_request({**JOB, 'chunk_size': chunk_size, 'engine': 'arrow'})
+    assert request['chunk_size'] == str(chunk_size)
+    assert request['engine'] == 'arrow'
@@ -0,0 +1,21 @@
+from telemetry import RunTelemetry
+
+
+def test_batched_calls_are_split_between_components_and_totals_stay_whole():
+    telemetry = RunTelemetry()
+    telemetry.record_llm_call({'prompt_eval_count': 100, 'eval_count': 11}, 1.0, project='590', component='SC')
+    telemetry.record_llm_call({'prompt_eval_count': 101, 'eval_count': 10}, 2.0, project='590',
+                              components={'FW': 2 / 3, 'UI': 1 / 3})
+
+    report = telemetry.to_dict()
+
+    assert report['totals']['prompt_eval_count'] == 201
+    assert report['projects']['590']['prompt_eval_count'] == 201
+    assert isinstance(report['totals']['eval_count'], int)
+    assert report['components']['590/SC']['prompt_eval_count'] == 100
+    assert report['components']['590/FW']['prompt_eval_count'] == 67
+    assert report['components']['590/UI']['prompt_eval_count'] == 34
+    assert report['components']['590/FW']['wall_time_s'] == 2.0 * 2 / 3
+    # The shared call counts once per component it served, but once in the run totals.
+    assert sum(totals['llm_calls'] for totals in report['components'].values()) == 3
+    assert report['totals']['llm_calls'] == 2
@@ -90,6 +90,7 @@ def build_html_report(project_overall_summaries, project_component_summaries, pr
           text-align: left;
         }
         td.component-name { vertical-align: middle; font-weight: bold; }
+        .shared-note { font-size: 12px; font-weight: normal; font-style: italic; color: #777; margin-top: 6px; }
         th { background: #29384a; color: #fff; font-weight: bold; }
         tr:hover td { background: #eef2f6; }
         .impact {
@@ -184,7 +185,12 @@ def build_html_report(project_overall_summaries, project_component_summaries, pr
         for comp, fields in sorted_components:
             csv_path = f'{output_dir}/{project}_{comp.replace(" ", "_").replace("/", "_")}.csv'
             html += '<tr>\n'
-            html += f'<td class="component-name"><a href="file://{os.path.abspath(csv_path)}">{comp}</a></td>\n'
+            shared_note = ''
+            if fields.get("shared_with"):
+                locations = ', '.join(f'{p} / {c}' for p, c in fields["shared_with"])
+                shared_note = f'<div class="shared-note">Same reports as {locations}; summary shared.</div>'
+            html += (f'<td class="component-name"><a href="file://{os.path.abspath(csv_path)}">{comp}</a>'
+                     f'{shared_note}</td>\n')
             html += f'<td>{fields.get("summary", "N/A")}</td>\n'
             html += f'<td>{fields.get("rec_devs", "N/A")}</td>\n'
             html += f'<td>{fields.get("rec_testers", "N/A")}</td>\n'